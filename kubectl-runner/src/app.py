@@ -7,6 +7,7 @@ Version: 2.0.0 - Added DynamoDB integration for task scheduling
 
 import os
 import json
+import functools
 import logging
 import logging.handlers
 import subprocess
@@ -14,7 +15,7 @@ import threading
 import time
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from flask import Flask, request, jsonify, Response, g
+from flask import Flask, request, jsonify, Response, g, has_request_context
 from flask_cors import CORS
 from croniter import croniter
 import yaml
@@ -22,6 +23,7 @@ import boto3
 from botocore.exceptions import ClientError
 import uuid
 import traceback
+from collections import OrderedDict
 
 # Configure structured logging
 class StructuredFormatter(logging.Formatter):
@@ -179,6 +181,12 @@ def log_with_context(level, message, **context):
     log_method = getattr(logger, level.lower(), logger.info)
     log_method(message, extra=extra)
 
+def current_request_id():
+    """Return the request_id of the HTTP request being served, or None outside a request"""
+    if has_request_context() and hasattr(g, 'request_id'):
+        return g.request_id
+    return None
+
 
 
 class DynamoDBManager:
@@ -311,6 +319,11 @@ class DynamoDBManager:
                 # Default to environment variable or 'unknown-cluster'
                 item['cluster_name'] = os.getenv('EKS_CLUSTER_NAME', 'unknown-cluster')
             
+            # Correlate with the originating API request (X-Request-ID)
+            request_id = current_request_id()
+            if request_id:
+                item['request_id'] = request_id
+            
             # Add any additional fields
             item.update(kwargs)
             
@@ -614,6 +627,11 @@ class DynamoDBManager:
             if error_message:
                 audit_item['error_message'] = error_message
             
+            # Correlate with the originating API request (X-Request-ID)
+            request_id = current_request_id()
+            if request_id:
+                audit_item['request_id'] = request_id
+            
             # Add any additional fields
             audit_item.update(kwargs)
             
@@ -666,6 +684,43 @@ class DynamoDBManager:
             logger.error(f"Error setting cost center permissions: {e}")
             raise
 
+# Weekly grid layout (index 0=Monday, matching datetime.weekday())
+WEEK_DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+HOUR_KEYS = tuple(f"{hour:02d}" for hour in range(24))
+
+@functools.lru_cache(maxsize=1024)
+def _expand_cron_in_range(cron_expression, range_start, range_end, max_occurrences=50):
+    """
+    Expand a cron expression into its firings within a time range
+    
+    Cached per (expression, range) so tasks sharing a schedule, and repeated
+    requests for the same week, only walk croniter once.
+    
+    Args:
+        cron_expression: Cron expression string (e.g., "0 9 * * 1-5")
+        range_start: datetime to start iterating from (exclusive)
+        range_end: datetime after which iteration stops (inclusive bound)
+        max_occurrences: Safety cap on the number of firings returned
+    
+    Returns:
+        Tuple of (scheduled_time_iso, day_of_week, hour, minute) tuples
+    """
+    cron = croniter(cron_expression, range_start)
+    occurrences = []
+    
+    while len(occurrences) < max_occurrences:
+        next_occurrence = cron.get_next(datetime)
+        if next_occurrence > range_end:
+            break
+        occurrences.append((
+            next_occurrence.isoformat(),
+            next_occurrence.weekday(),  # 0=Monday, 6=Sunday
+            next_occurrence.hour,
+            next_occurrence.minute
+        ))
+    
+    return tuple(occurrences)
+
 class TaskScheduler:
     def __init__(self):
         self.tasks = {}
@@ -689,8 +744,9 @@ class TaskScheduler:
         self.task_locks = {}  # Maps task_id to Lock for thread-safe operations
         
         # Weekly schedule cache
-        self.weekly_cache = {}  # Maps week_start_date to cached data
+        self.weekly_cache = OrderedDict()  # Maps week_start_date to cached data, least recently used first
         self.weekly_cache_ttl = int(os.getenv('WEEKLY_CACHE_TTL', '300'))  # Default 5 minutes
+        self.weekly_cache_max_entries = int(os.getenv('WEEKLY_CACHE_MAX_ENTRIES', '128'))
         self.weekly_cache_enabled = os.getenv('WEEKLY_CACHE_ENABLED', 'true').lower() == 'true'
         
         # Protected namespaces configuration
@@ -3204,33 +3260,17 @@ class TaskScheduler:
             if not cron_expression:
                 return []
             
-            occurrences = []
-            
-            # Use croniter to find all occurrences in the week
-            cron = croniter(cron_expression, week_start)
-            
-            # Get up to 50 occurrences to prevent infinite loops
-            max_occurrences = 50
-            occurrence_count = 0
-            
-            while occurrence_count < max_occurrences:
-                next_occurrence = cron.get_next(datetime)
-                
-                # If we've passed the end of the week, stop
-                if next_occurrence > week_end:
-                    break
-                
-                # Add this occurrence
-                occurrences.append({
-                    'scheduled_time': next_occurrence.isoformat(),
-                    'day_of_week': next_occurrence.weekday(),  # 0=Monday, 6=Sunday
-                    'hour': next_occurrence.hour,
-                    'minute': next_occurrence.minute
-                })
-                
-                occurrence_count += 1
-            
-            return occurrences
+            # Firings are cached per schedule and week (up to 50 per week)
+            return [
+                {
+                    'scheduled_time': scheduled_time,
+                    'day_of_week': day_of_week,
+                    'hour': hour,
+                    'minute': minute
+                }
+                for scheduled_time, day_of_week, hour, minute
+                in _expand_cron_in_range(cron_expression, week_start, week_end)
+            ]
             
         except Exception as e:
             logger.error(f"Error getting task occurrences: {e}")
@@ -3250,32 +3290,12 @@ class TaskScheduler:
         try:
             from datetime import timedelta
             
-            # Initialize the time slots structure
-            time_slots = {}
-            
-            # Days of the week (0=Monday, 6=Sunday)
-            day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-            
-            # Initialize empty slots for each day and hour
-            for day_index, day_name in enumerate(day_names):
-                time_slots[day_name] = {}
-                for hour in range(24):
-                    time_slots[day_name][f"{hour:02d}"] = []
+            # 7x24 grid indexed by (day_of_week, hour); converted to named keys once at the end
+            slots = [[[] for _ in HOUR_KEYS] for _ in WEEK_DAY_NAMES]
             
             # Process each task occurrence
             for task in weekly_tasks:
                 try:
-                    # Parse the scheduled time
-                    scheduled_time = datetime.fromisoformat(task['scheduled_time'])
-                    
-                    # Get day of week and hour
-                    day_of_week = scheduled_time.weekday()  # 0=Monday, 6=Sunday
-                    hour = scheduled_time.hour
-                    
-                    # Get the day name
-                    day_name = day_names[day_of_week]
-                    hour_key = f"{hour:02d}"
-                    
                     # Create the task slot data
                     task_slot = {
                         'task_id': task['task_id'],
@@ -3293,17 +3313,20 @@ class TaskScheduler:
                         'status': task.get('status', 'pending')
                     }
                     
-                    # Add to the appropriate time slot
-                    time_slots[day_name][hour_key].append(task_slot)
+                    # day_of_week (0=Monday) and hour are precomputed by get_weekly_scheduled_tasks
+                    slots[task['day_of_week']][task['hour']].append(task_slot)
                     
                 except Exception as task_error:
                     logger.error(f"Error processing task {task.get('task_id', 'unknown')} into time slots: {task_error}")
                     continue
             
-            # Sort tasks within each time slot by minute
-            for day_name in day_names:
-                for hour_key in time_slots[day_name]:
-                    time_slots[day_name][hour_key].sort(key=lambda x: x['minute'])
+            # Sort tasks within each time slot by minute and name the days/hours
+            time_slots = {}
+            for day_name, day_slots in zip(WEEK_DAY_NAMES, slots):
+                for hour_tasks in day_slots:
+                    if len(hour_tasks) > 1:
+                        hour_tasks.sort(key=lambda x: x['minute'])
+                time_slots[day_name] = dict(zip(HOUR_KEYS, day_slots))
             
             logger.info(f"Processed {len(weekly_tasks)} tasks into time slots for week starting {week_start_date.strftime('%Y-%m-%d')}")
             return time_slots
@@ -3350,6 +3373,8 @@ class TaskScheduler:
             # Calculate week end date
             week_end_date = week_start_date + timedelta(days=6)
             
+            total_tasks, namespaces, cost_centers = self._summarize_slots(time_slots)
+            
             # Format the response
             response = {
                 'success': True,
@@ -3358,9 +3383,9 @@ class TaskScheduler:
                     'week_end_date': week_end_date.strftime('%Y-%m-%d'),
                     'time_slots': time_slots,
                     'metadata': {
-                        'total_tasks': self._count_total_tasks_in_slots(time_slots),
-                        'active_namespaces': self._get_unique_namespaces_in_slots(time_slots),
-                        'cost_centers': self._get_unique_cost_centers_in_slots(time_slots),
+                        'total_tasks': total_tasks,
+                        'active_namespaces': namespaces,
+                        'cost_centers': cost_centers,
                         'generated_at': datetime.now().isoformat(),
                         'timezone': 'UTC'  # TODO: Make this configurable
                     }
@@ -3377,31 +3402,23 @@ class TaskScheduler:
                 'data': None
             }
 
-    def _count_total_tasks_in_slots(self, time_slots):
-        """Count total number of tasks across all time slots"""
+    def _summarize_slots(self, time_slots):
+        """
+        Collect time slot metadata in a single pass
+        
+        Returns:
+            Tuple of (total task count, sorted unique namespaces, sorted unique cost centers)
+        """
         total = 0
-        for day_slots in time_slots.values():
-            for hour_tasks in day_slots.values():
-                total += len(hour_tasks)
-        return total
-
-    def _get_unique_namespaces_in_slots(self, time_slots):
-        """Get list of unique namespaces in the time slots"""
         namespaces = set()
-        for day_slots in time_slots.values():
-            for hour_tasks in day_slots.values():
-                for task in hour_tasks:
-                    namespaces.add(task['namespace_name'])
-        return sorted(list(namespaces))
-
-    def _get_unique_cost_centers_in_slots(self, time_slots):
-        """Get list of unique cost centers in the time slots"""
         cost_centers = set()
         for day_slots in time_slots.values():
             for hour_tasks in day_slots.values():
+                total += len(hour_tasks)
                 for task in hour_tasks:
+                    namespaces.add(task['namespace_name'])
                     cost_centers.add(task['cost_center'])
-        return sorted(list(cost_centers))
+        return total, sorted(namespaces), sorted(cost_centers)
 
     def get_weekly_schedule_cached(self, week_start_date):
         """
@@ -3457,6 +3474,7 @@ class TaskScheduler:
                 
                 # Check if cache entry is still valid
                 if time.time() - cache_entry['timestamp'] < self.weekly_cache_ttl:
+                    self.weekly_cache.move_to_end(cache_key)
                     return cache_entry['data']
                 else:
                     # Cache expired, remove it
@@ -3478,6 +3496,12 @@ class TaskScheduler:
                 'data': data,
                 'timestamp': time.time()
             }
+            self.weekly_cache.move_to_end(cache_key)
+            
+            # Evict least recently used weeks beyond the size cap
+            while len(self.weekly_cache) > self.weekly_cache_max_entries:
+                evicted_key, _ = self.weekly_cache.popitem(last=False)
+                logger.debug(f"Evicted weekly cache entry for {evicted_key}")
             
             logger.debug(f"Cached weekly schedule for {cache_key}")
             
@@ -3533,6 +3557,7 @@ class TaskScheduler:
             return {
                 'enabled': self.weekly_cache_enabled,
                 'ttl_seconds': self.weekly_cache_ttl,
+                'max_entries': self.weekly_cache_max_entries,
                 'cached_entries': len(self.weekly_cache),
                 'cache_keys': list(self.weekly_cache.keys()),
                 'total_memory_entries': len(self.weekly_cache)
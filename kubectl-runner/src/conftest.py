@@ -0,0 +1,25 @@
+"""
+Shared pytest fixtures for the kubectl-runner tests
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """Create an isolated TaskScheduler without background threads or DynamoDB"""
+    from app import TaskScheduler
+
+    monkeypatch.setenv('AUTO_SAVE_ENABLED', 'false')
+    monkeypatch.setenv('DEFAULT_VALIDATION_ENABLED', 'false')
+    with patch('app.DynamoDBManager'):
+        test_scheduler = TaskScheduler()
+    test_scheduler.tasks.clear()
+    return test_scheduler
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test that DynamoDB log items carry the X-Request-ID of the API request that
+wrote them, and that writes outside a request store no request_id
+"""
+
+import pytest
+from unittest.mock import Mock
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, DynamoDBManager
+
+REQUEST_ID = 'req-0123456789abcdef'
+
+
+@pytest.fixture
+def manager():
+    """Create a DynamoDBManager with a mocked logs table and no AWS setup"""
+    dynamodb_manager = DynamoDBManager.__new__(DynamoDBManager)
+    dynamodb_manager.table = Mock()
+    return dynamodb_manager
+
+
+def log_activity(manager):
+    """Write a namespace activity log item"""
+    manager.log_namespace_activity(
+        namespace_name='test-namespace',
+        operation_type='manual_activation',
+        cost_center='test-cc',
+        requested_by='test-user',
+        cluster_name='test-cluster'
+    )
+
+
+def log_validation_audit(manager):
+    """Write a validation audit log item"""
+    manager._log_validation_audit(
+        validation_type='cost_center_permission',
+        cost_center='test-cc',
+        validation_result=True,
+        validation_source='cache',
+        requested_by='test-user',
+        cluster_name='test-cluster'
+    )
+
+
+LOG_WRITERS = [log_activity, log_validation_audit]
+
+
+def written_item(manager):
+    """Return the Item passed to the single put_item call"""
+    manager.table.put_item.assert_called_once()
+    return manager.table.put_item.call_args.kwargs['Item']
+
+
+@pytest.mark.parametrize('write_log', LOG_WRITERS)
+def test_request_id_stored_inside_request(manager, write_log):
+    """Test that items written while serving a request carry its X-Request-ID"""
+    with app.test_request_context(headers={'X-Request-ID': REQUEST_ID}):
+        app.preprocess_request()
+        write_log(manager)
+
+    assert written_item(manager)['request_id'] == REQUEST_ID
+
+
+@pytest.mark.parametrize('write_log', LOG_WRITERS)
+def test_no_request_id_outside_request(manager, write_log):
+    """Test that background writes do not add a request_id key"""
+    write_log(manager)
+
+    assert 'request_id' not in written_item(manager)
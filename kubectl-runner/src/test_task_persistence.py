@@ -7,14 +7,25 @@ Tests save/load, backup/recovery, export/import, and validation
 import pytest
 import json
 import os
+import re
 import tempfile
 import shutil
+import time
 from datetime import datetime, timedelta
 import sys
 
 # Add parent directory to path to import app
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+_VALID_STATUSES = frozenset({'pending', 'running', 'completed', 'failed', 'cancelled'})
+_REQUIRED_FIELDS = ('title', 'status')
+_EXPORT_FILE_RE = re.compile(r'^tasks_export_[\d_]+\.json$')
+
+
+def _maybe_iso(value):
+    """Cheap shape check for ISO-8601 dates before calling fromisoformat"""
+    return isinstance(value, str) and 10 <= len(value) <= 32 and value[4] == '-' and value[7] == '-'
+
 
 class MockTaskScheduler:
     """Mock TaskScheduler for testing persistence"""
@@ -23,6 +34,26 @@ class MockTaskScheduler:
         self.tasks = {}
         self.config_dir = config_dir or tempfile.mkdtemp()
         self.cluster_name = 'test-cluster'
+        self._dir_cache = None  # Maps entry name to os.DirEntry for config_dir
+    
+    def _refresh_dir(self):
+        """Snapshot config_dir entries with a single scandir pass"""
+        try:
+            with os.scandir(self.config_dir) as entries:
+                self._dir_cache = {entry.name: entry for entry in entries}
+        except FileNotFoundError:
+            self._dir_cache = {}
+        return self._dir_cache
+    
+    def _in_config_dir(self, path):
+        """Whether path names an entry directly inside config_dir"""
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.config_dir)
+    
+    def _path_exists(self, path):
+        """Check existence against the scandir snapshot when path is in config_dir"""
+        if self._dir_cache is not None and self._in_config_dir(path):
+            return os.path.basename(path) in self._dir_cache
+        return os.path.exists(path)
     
     def _validate_tasks(self, tasks):
         """Validate tasks data structure"""
@@ -34,13 +65,11 @@ class MockTaskScheduler:
                 if not isinstance(task, dict):
                     return False
                 
-                required_fields = ['title', 'status']
-                for field in required_fields:
+                for field in _REQUIRED_FIELDS:
                     if field not in task:
                         return False
                 
-                valid_statuses = ['pending', 'running', 'completed', 'failed', 'cancelled']
-                if task.get('status') not in valid_statuses:
+                if task.get('status') not in _VALID_STATUSES:
                     task['status'] = 'pending'
             
             return True
@@ -50,12 +79,16 @@ class MockTaskScheduler:
     def save_tasks(self):
         """Save tasks to file with atomic write and backup"""
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
-            
             tasks_file = os.path.join(self.config_dir, 'tasks.json')
             temp_file = os.path.join(self.config_dir, 'tasks.json.tmp')
             backup_file = os.path.join(self.config_dir, 'tasks.json.backup')
             
+            # Nothing to persist and nothing to overwrite
+            if not self.tasks and not os.path.exists(tasks_file):
+                return True
+            
+            os.makedirs(self.config_dir, exist_ok=True)
+            
             # Create backup
             if os.path.exists(tasks_file):
                 shutil.copy2(tasks_file, backup_file)
@@ -70,6 +103,7 @@ class MockTaskScheduler:
             
             # Atomic rename
             os.replace(temp_file, tasks_file)
+            self._dir_cache = None
             
             return True
         except Exception as e:
@@ -81,9 +115,15 @@ class MockTaskScheduler:
         try:
             tasks_file = os.path.join(self.config_dir, 'tasks.json')
             backup_file = os.path.join(self.config_dir, 'tasks.json.backup')
+            self._refresh_dir()
+            
+            # No saved state yet is a valid, empty task list
+            if not self._path_exists(tasks_file) and not self._path_exists(backup_file):
+                self.tasks = {}
+                return True
             
             # Try main file
-            if os.path.exists(tasks_file):
+            if self._path_exists(tasks_file):
                 try:
                     with open(tasks_file, 'r') as f:
                         loaded_tasks = json.load(f)
@@ -95,7 +135,7 @@ class MockTaskScheduler:
                     pass
             
             # Try backup
-            if os.path.exists(backup_file):
+            if self._path_exists(backup_file):
                 try:
                     with open(backup_file, 'r') as f:
                         loaded_tasks = json.load(f)
@@ -116,13 +156,13 @@ class MockTaskScheduler:
     def export_tasks(self, export_path=None):
         """Export tasks with metadata"""
         try:
+            ns = time.time_ns()
             if export_path is None:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                export_path = os.path.join(self.config_dir, f'tasks_export_{timestamp}.json')
+                export_path = os.path.join(self.config_dir, f'tasks_export_{ns}.json')
             
             export_data = {
                 'version': '1.0',
-                'exported_at': datetime.now().isoformat(),
+                'exported_at': datetime.fromtimestamp(ns / 1e9).isoformat(),
                 'task_count': len(self.tasks),
                 'cluster_name': self.cluster_name,
                 'tasks': self.tasks
@@ -132,6 +172,7 @@ class MockTaskScheduler:
             
             with open(export_path, 'w') as f:
                 json.dump(export_data, f, indent=2, sort_keys=True)
+            self._dir_cache = None
             
             return export_path
         except Exception:
@@ -140,7 +181,9 @@ class MockTaskScheduler:
     def import_tasks(self, import_path, merge=False):
         """Import tasks from file"""
         try:
-            if not os.path.exists(import_path):
+            if self._in_config_dir(import_path):
+                self._refresh_dir()
+            if not self._path_exists(import_path):
                 return None
             
             with open(import_path, 'r') as f:
@@ -167,6 +210,14 @@ class MockTaskScheduler:
         except Exception:
             return None
     
+    def list_exports(self):
+        """List export files in config_dir, sorted by name"""
+        entries = self._refresh_dir()
+        return sorted(
+            entry.path for name, entry in entries.items()
+            if _EXPORT_FILE_RE.match(name) and entry.is_file()
+        )
+    
     def get_task_statistics(self):
         """Get task statistics"""
         try:
@@ -205,13 +256,15 @@ class MockTaskScheduler:
                     continue
                 
                 last_run = task.get('last_run')
-                if last_run:
-                    try:
-                        last_run_date = datetime.fromisoformat(last_run)
-                        if last_run_date < cutoff_date:
-                            tasks_to_remove.append(task_id)
-                    except (ValueError, TypeError):
-                        pass
+                if not _maybe_iso(last_run):
+                    continue
+                
+                try:
+                    if datetime.fromisoformat(last_run) < cutoff_date:
+                        tasks_to_remove.append(task_id)
+                except (ValueError, TypeError):
+                    # Unparseable or timezone-aware dates are left alone
+                    continue
             
             for task_id in tasks_to_remove:
                 del self.tasks[task_id]
@@ -227,10 +280,13 @@ class MockTaskScheduler:
 class TestTaskPersistence:
     """Test task persistence functionality"""
     
-    def test_save_and_load_tasks(self):
+    @pytest.fixture
+    def scheduler(self, tmp_path):
+        """Create a MockTaskScheduler backed by a pytest-managed temp dir"""
+        return MockTaskScheduler(str(tmp_path))
+    
+    def test_save_and_load_tasks(self, scheduler):
         """Test basic save and load"""
-        scheduler = MockTaskScheduler()
-        
         # Add some tasks
         scheduler.tasks = {
             'task-1': {'title': 'Task 1', 'status': 'pending'},
@@ -249,10 +305,8 @@ class TestTaskPersistence:
         assert 'task-1' in scheduler2.tasks
         assert scheduler2.tasks['task-1']['title'] == 'Task 1'
     
-    def test_backup_recovery(self):
+    def test_backup_recovery(self, scheduler):
         """Test recovery from backup when main file is corrupted"""
-        scheduler = MockTaskScheduler()
-        
         # Save valid tasks twice to ensure backup is created
         scheduler.tasks = {
             'task-1': {'title': 'Task 1', 'status': 'pending'}
@@ -275,10 +329,8 @@ class TestTaskPersistence:
         assert len(scheduler2.tasks) >= 1
         assert 'task-1' in scheduler2.tasks
     
-    def test_validation_rejects_invalid_tasks(self):
+    def test_validation_rejects_invalid_tasks(self, scheduler):
         """Test that validation rejects invalid task structures"""
-        scheduler = MockTaskScheduler()
-        
         # Invalid: not a dict
         assert scheduler._validate_tasks([]) is False
         
@@ -291,10 +343,8 @@ class TestTaskPersistence:
         # Valid
         assert scheduler._validate_tasks({'task-1': {'title': 'Task 1', 'status': 'pending'}}) is True
     
-    def test_export_tasks(self):
+    def test_export_tasks(self, scheduler):
         """Test exporting tasks with metadata"""
-        scheduler = MockTaskScheduler()
-        
         scheduler.tasks = {
             'task-1': {'title': 'Task 1', 'status': 'pending'},
             'task-2': {'title': 'Task 2', 'status': 'completed'}
@@ -316,10 +366,32 @@ class TestTaskPersistence:
         assert 'tasks' in export_data
         assert len(export_data['tasks']) == 2
     
-    def test_import_tasks_replace(self):
-        """Test importing tasks (replace mode)"""
-        scheduler = MockTaskScheduler()
+    def test_list_exports(self, scheduler):
+        """Test listing export files ignores other files in config_dir"""
+        scheduler.tasks = {
+            'task-1': {'title': 'Task 1', 'status': 'pending'}
+        }
+        scheduler.save_tasks()
         
+        first = scheduler.export_tasks()
+        second = scheduler.export_tasks()
+        
+        assert scheduler.list_exports() == sorted([first, second])
+    
+    def test_list_exports_sees_other_writers(self, scheduler):
+        """Test that exports written by another scheduler after a load are listed"""
+        scheduler.load_tasks()
+        
+        other = MockTaskScheduler(scheduler.config_dir)
+        other.tasks = {
+            'task-1': {'title': 'Task 1', 'status': 'pending'}
+        }
+        export_path = other.export_tasks()
+        
+        assert scheduler.list_exports() == [export_path]
+    
+    def test_import_tasks_replace(self, scheduler, tmp_path):
+        """Test importing tasks (replace mode)"""
         # Create export
         scheduler.tasks = {
             'task-1': {'title': 'Task 1', 'status': 'pending'}
@@ -327,7 +399,7 @@ class TestTaskPersistence:
         export_path = scheduler.export_tasks()
         
         # Create new scheduler with different tasks
-        scheduler2 = MockTaskScheduler()
+        scheduler2 = MockTaskScheduler(str(tmp_path / 'import'))
         scheduler2.tasks = {
             'task-2': {'title': 'Task 2', 'status': 'completed'}
         }
@@ -340,10 +412,8 @@ class TestTaskPersistence:
         assert 'task-1' in scheduler2.tasks
         assert 'task-2' not in scheduler2.tasks
     
-    def test_import_tasks_merge(self):
+    def test_import_tasks_merge(self, scheduler, tmp_path):
         """Test importing tasks (merge mode)"""
-        scheduler = MockTaskScheduler()
-        
         # Create export
         scheduler.tasks = {
             'task-1': {'title': 'Task 1', 'status': 'pending'}
@@ -351,7 +421,7 @@ class TestTaskPersistence:
         export_path = scheduler.export_tasks()
         
         # Create new scheduler with different tasks
-        scheduler2 = MockTaskScheduler()
+        scheduler2 = MockTaskScheduler(str(tmp_path / 'import'))
         scheduler2.tasks = {
             'task-2': {'title': 'Task 2', 'status': 'completed'}
         }
@@ -364,10 +434,8 @@ class TestTaskPersistence:
         assert 'task-1' in scheduler2.tasks
         assert 'task-2' in scheduler2.tasks
     
-    def test_task_statistics(self):
+    def test_task_statistics(self, scheduler):
         """Test task statistics calculation"""
-        scheduler = MockTaskScheduler()
-        
         scheduler.tasks = {
             'task-1': {'title': 'Task 1', 'status': 'pending', 'operation_type': 'activate', 'schedule': '0 9 * * *'},
             'task-2': {'title': 'Task 2', 'status': 'completed', 'operation_type': 'deactivate', 'schedule': ''},
@@ -385,10 +453,8 @@ class TestTaskPersistence:
         assert stats['scheduled'] == 2
         assert stats['one_time'] == 1
     
-    def test_cleanup_old_tasks(self):
+    def test_cleanup_old_tasks(self, scheduler):
         """Test cleaning up old tasks"""
-        scheduler = MockTaskScheduler()
-        
         # Create tasks with different ages
         old_date = (datetime.now() - timedelta(days=40)).isoformat()
         recent_date = (datetime.now() - timedelta(days=10)).isoformat()
@@ -409,10 +475,31 @@ class TestTaskPersistence:
         assert 'task-2' in scheduler.tasks  # Recent completed
         assert 'task-3' in scheduler.tasks  # Old pending (not removed)
     
-    def test_atomic_write(self):
-        """Test that save uses atomic write (temp file + rename)"""
-        scheduler = MockTaskScheduler()
+    def test_cleanup_skips_malformed_last_run(self, scheduler):
+        """Test that unparseable last_run values are left alone"""
+        scheduler.tasks = {
+            'task-1': {'title': 'No date', 'status': 'completed', 'last_run': 'yesterday'},
+            'task-2': {'title': 'Numeric', 'status': 'failed', 'last_run': 1700000000},
+            'task-3': {'title': 'Bad day', 'status': 'completed', 'last_run': '2024-02-31T00:00:00'}
+        }
         
+        assert scheduler.cleanup_old_tasks(days=30) == 0
+        assert len(scheduler.tasks) == 3
+    
+    def test_cleanup_skips_timezone_aware_last_run(self, scheduler):
+        """Test that an aware last_run is skipped without aborting the cleanup"""
+        old_date = (datetime.now() - timedelta(days=40)).isoformat()
+        
+        scheduler.tasks = {
+            'task-1': {'title': 'Aware', 'status': 'completed', 'last_run': '2020-01-01T00:00:00+00:00'},
+            'task-2': {'title': 'Naive', 'status': 'completed', 'last_run': old_date}
+        }
+        
+        assert scheduler.cleanup_old_tasks(days=30) == 1
+        assert list(scheduler.tasks) == ['task-1']
+    
+    def test_atomic_write(self, scheduler):
+        """Test that save uses atomic write (temp file + rename)"""
         scheduler.tasks = {
             'task-1': {'title': 'Task 1', 'status': 'pending'}
         }
@@ -432,6 +519,17 @@ class TestTaskPersistence:
         backup_file = os.path.join(scheduler.config_dir, 'tasks.json.backup')
         # Backup only exists if there was a previous save
         # On first save, there's no backup
+    
+    def test_save_and_load_empty(self, scheduler):
+        """Test that empty state skips the write and loads as empty"""
+        assert scheduler.save_tasks() is True
+        
+        tasks_file = os.path.join(scheduler.config_dir, 'tasks.json')
+        assert not os.path.exists(tasks_file)
+        
+        scheduler2 = MockTaskScheduler(scheduler.config_dir)
+        assert scheduler2.load_tasks() is True
+        assert scheduler2.tasks == {}
 
 
 if __name__ == "__main__":
@@ -4,369 +4,326 @@ Test script for user tracking in all operations
 Tests that requested_by field is properly captured in all operations
 """
 
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import sys
 import time
+import uuid
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 
-def test_user_tracking():
-    """Test user tracking for all operations"""
-    base_url = "http://localhost:8080"
+try:
+    import orjson
+except ImportError:  # orjson is a dev-only extra (requirements-dev.txt)
+    orjson = None
+
+# Set VERBOSE_TESTS=1 to dump full API responses and log items
+VERBOSE = bool(os.getenv('VERBOSE_TESTS'))
+
+
+def dump_json(data):
+    """Pretty-print API responses and DynamoDB items (Decimals rendered via str)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2, default=str)
+
+
+def query_latest_log(table, namespace, timestamp_before, filter_expression):
+    """
+    Return the most recent log matching filter_expression, or None
     
-    # DynamoDB setup
-    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-    table_name = 'task-scheduler-logs'
-    table = dynamodb.Table(table_name)
+    Reads newest-first and stops at the first page containing a match.
+    Limit is not used because DynamoDB applies it before the filter, so a
+    non-matching newer item would hide the one we are looking for.
+    """
+    query_kwargs = {
+        'KeyConditionExpression': Key('namespace_name').eq(namespace) & Key('timestamp_start').gte(timestamp_before),
+        'FilterExpression': filter_expression,
+        'ScanIndexForward': False,
+        'ConsistentRead': True
+    }
+    while True:
+        query_response = table.query(**query_kwargs)
+        items = query_response.get('Items', [])
+        if items:
+            return items[0]
+        if 'LastEvaluatedKey' not in query_response:
+            return None
+        query_kwargs['ExclusiveStartKey'] = query_response['LastEvaluatedKey']
+
+
+def wait_for_log(table, namespace, timestamp_before, filter_expression, timeout=3.0, interval=0.1):
+    """
+    Poll the logs table until a matching entry is visible
     
-    print("Testing User Tracking in All Operations")
-    print("=" * 70)
+    Uses strongly consistent reads, so a log written before the API
+    responded is returned on the first query; polling only covers the
+    window where the write is still in flight. Matching is done by
+    DynamoDB through filter_expression, so only relevant items are
+    returned to the client.
     
-    # Setup: Create test cost center
-    print("\nSetup: Creating test cost center...")
-    try:
-        response = requests.post(
-            f"{base_url}/api/cost-centers/user-tracking-test/permissions",
-            json={
-                "is_authorized": True,
-                "max_concurrent_namespaces": 5,
-                "authorized_namespaces": []
-            }
-        )
-        print(f"   Created user-tracking-test: {response.status_code}")
-    except Exception as e:
-        print(f"   Warning: Could not create user-tracking-test: {e}")
-    
-    time.sleep(2)  # Give DynamoDB time to propagate
+    Returns:
+        The most recent matching log item, or None if none appeared before timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        log = query_latest_log(table, namespace, timestamp_before, filter_expression)
+        if log is not None or time.monotonic() >= deadline:
+            return log
+        time.sleep(interval)
+
+
+@dataclass
+class LogCheck:
+    """An API call whose DynamoDB log must record the expected requesting user"""
+    label: str
+    method: str
+    path: str
+    payload: dict
+    namespace: str
+    operation_filter: object  # boto3 condition on operation_type
+    expected_user: str
+    expected_status: int = 200
+    expected_cost_center: str = None
+    expect_created_by: bool = False
+
+
+CHECKS = [
+    LogCheck(
+        label="NAMESPACE ACTIVATION",
+        method='POST',
+        path="/api/namespaces/default/activate",
+        payload={
+            "cost_center": "user-tracking-test",
+            "user_id": "john.doe",
+            "requested_by": "jane.smith"  # Different from user_id
+        },
+        namespace='default',
+        operation_filter=Attr('operation_type').eq('manual_activation'),
+        expected_user='jane.smith',
+        expected_cost_center='user-tracking-test'
+    ),
+    LogCheck(
+        label="NAMESPACE DEACTIVATION",
+        method='POST',
+        path="/api/namespaces/default/deactivate",
+        payload={
+            "cost_center": "user-tracking-test",
+            "user_id": "alice.jones",
+            "requested_by": "bob.wilson"
+        },
+        namespace='default',
+        operation_filter=Attr('operation_type').eq('manual_deactivation'),
+        expected_user='bob.wilson'
+    ),
+    LogCheck(
+        label="TASK CREATION",
+        method='POST',
+        path="/api/tasks",
+        payload={
+            "title": "User Tracking Test Task",
+            "operation_type": "activate",
+            "namespace": "user-tracking-namespace",
+            "cost_center": "user-tracking-test",
+            "user_id": "charlie.brown",
+            "requested_by": "david.miller",
+            "schedule": "0 9 * * 1-5"
+        },
+        namespace='user-tracking-namespace',
+        operation_filter=Attr('operation_type').eq('task_created'),
+        expected_user='david.miller',
+        expected_status=201,
+        expect_created_by=True
+    ),
+    LogCheck(
+        label="VALIDATION",
+        method='GET',
+        path="/api/cost-centers/user-tracking-test/validate",
+        payload={
+            "user_id": "emily.davis",
+            "requested_by": "frank.garcia",
+            "operation_type": "test_validation",
+            "namespace": "validation-test-ns"
+        },
+        namespace='validation-test-ns',
+        operation_filter=Attr('operation_type').begins_with('validation_'),
+        expected_user='frank.garcia'
+    ),
+    LogCheck(
+        label="DEFAULT USER (no user provided)",
+        method='POST',
+        path="/api/namespaces/default/activate",
+        payload={
+            "cost_center": "user-tracking-test"
+            # No user_id or requested_by provided
+        },
+        namespace='default',
+        operation_filter=Attr('operation_type').eq('manual_activation'),
+        expected_user='anonymous'  # Endpoint default
+    ),
+]
+
+
+def run_check(session, base_url, table, check, lines):
+    """
+    Call the API for one check and verify the user recorded in its log
     
-    # Test 1: Namespace activation with requested_by
-    print("\n1. Testing user tracking in NAMESPACE ACTIVATION...")
+    Report lines are appended to lines instead of printed, so checks run
+    from concurrent sequences do not interleave their output.
+    """
+    lines.append(f"\n{CHECKS.index(check) + 1}. Testing user tracking in {check.label}...")
     try:
         timestamp_before = int(time.time())
+        request_id = uuid.uuid4().hex
         
-        response = requests.post(
-            f"{base_url}/api/namespaces/default/activate",
-            json={
-                "cost_center": "user-tracking-test",
-                "user_id": "john.doe",
-                "requested_by": "jane.smith"  # Different from user_id
-            }
+        # GET endpoints take the payload as query parameters
+        body = {'params': check.payload} if check.method == 'GET' else {'json': check.payload}
+        response = session.request(
+            check.method,
+            f"{base_url}{check.path}",
+            headers={'X-Request-ID': request_id},
+            **body
         )
-        print(f"   Activation Status Code: {response.status_code}")
-        print(f"   Activation Response: {json.dumps(response.json(), indent=2)}")
+        lines.append(f"   Status Code: {response.status_code}")
+        if VERBOSE:
+            lines.append(f"   Response: {dump_json(response.json())}")
         
-        if response.status_code != 200:
-            print(f"   ✗ Test failed: Expected 200, got {response.status_code}")
+        if response.status_code != check.expected_status:
+            lines.append(f"   ✗ Test failed: Expected {check.expected_status}, got {response.status_code}")
             return False
         
-        # Wait for DynamoDB to process
-        time.sleep(2)
-        
-        # Query DynamoDB for activity log
-        try:
-            query_response = table.query(
-                KeyConditionExpression='namespace_name = :ns AND timestamp_start >= :ts',
-                ExpressionAttributeValues={
-                    ':ns': 'default',
-                    ':ts': timestamp_before
-                }
-            )
-            
-            activity_logs = query_response.get('Items', [])
-            activation_logs = [
-                log for log in activity_logs 
-                if log.get('operation_type') == 'manual_activation'
-            ]
-            
-            print(f"   Found {len(activation_logs)} activation log(s)")
-            
-            if len(activation_logs) > 0:
-                log = activation_logs[0]
-                print(f"   Activity Log: {json.dumps(log, indent=2, default=str)}")
-                
-                # Verify requested_by field
-                if (log.get('requested_by') == 'jane.smith' and
-                    log.get('user_id') == 'jane.smith' and
-                    log.get('cost_center') == 'user-tracking-test'):
-                    print("   ✓ Test passed: requested_by captured correctly")
-                else:
-                    print(f"   ✗ Test failed: requested_by={log.get('requested_by')}, expected=jane.smith")
-                    return False
-            else:
-                print("   ✗ Test failed: No activation log found")
+        if check.expect_created_by:
+            created_by = response.json().get('created_by')
+            if created_by != check.expected_user:
+                lines.append(f"   ✗ Test failed: created_by={created_by}, expected={check.expected_user}")
                 return False
-                
-        except Exception as e:
-            print(f"   ✗ Test failed querying DynamoDB: {e}")
-            return False
-            
-    except Exception as e:
-        print(f"   ✗ Test failed with exception: {e}")
-        return False
-    
-    # Test 2: Namespace deactivation with requested_by
-    print("\n2. Testing user tracking in NAMESPACE DEACTIVATION...")
-    try:
-        timestamp_before = int(time.time())
+            lines.append("   ✓ Task has created_by field set correctly")
         
-        response = requests.post(
-            f"{base_url}/api/namespaces/default/deactivate",
-            json={
-                "cost_center": "user-tracking-test",
-                "user_id": "alice.jones",
-                "requested_by": "bob.wilson"
-            }
-        )
-        print(f"   Deactivation Status Code: {response.status_code}")
-        print(f"   Deactivation Response: {json.dumps(response.json(), indent=2)}")
-        
-        if response.status_code != 200:
-            print(f"   ✗ Test failed: Expected 200, got {response.status_code}")
-            return False
-        
-        # Wait for DynamoDB to process
-        time.sleep(2)
-        
-        # Query DynamoDB for activity log
+        # Query DynamoDB for the log written by this request
         try:
-            query_response = table.query(
-                KeyConditionExpression='namespace_name = :ns AND timestamp_start >= :ts',
-                ExpressionAttributeValues={
-                    ':ns': 'default',
-                    ':ts': timestamp_before
-                }
+            log = wait_for_log(
+                table, check.namespace, timestamp_before,
+                check.operation_filter & Attr('request_id').eq(request_id)
             )
-            
-            activity_logs = query_response.get('Items', [])
-            deactivation_logs = [
-                log for log in activity_logs 
-                if log.get('operation_type') == 'manual_deactivation'
-            ]
-            
-            print(f"   Found {len(deactivation_logs)} deactivation log(s)")
-            
-            if len(deactivation_logs) > 0:
-                log = deactivation_logs[0]
-                print(f"   Activity Log: {json.dumps(log, indent=2, default=str)}")
-                
-                # Verify requested_by field
-                if (log.get('requested_by') == 'bob.wilson' and
-                    log.get('user_id') == 'bob.wilson'):
-                    print("   ✓ Test passed: requested_by captured correctly")
-                else:
-                    print(f"   ✗ Test failed: requested_by={log.get('requested_by')}, expected=bob.wilson")
-                    return False
-            else:
-                print("   ✗ Test failed: No deactivation log found")
-                return False
-                
         except Exception as e:
-            print(f"   ✗ Test failed querying DynamoDB: {e}")
+            lines.append(f"   ✗ Test failed querying DynamoDB: {e}")
             return False
-            
-    except Exception as e:
-        print(f"   ✗ Test failed with exception: {e}")
-        return False
-    
-    # Test 3: Task creation with requested_by
-    print("\n3. Testing user tracking in TASK CREATION...")
-    try:
-        timestamp_before = int(time.time())
-        
-        response = requests.post(
-            f"{base_url}/api/tasks",
-            json={
-                "title": "User Tracking Test Task",
-                "operation_type": "activate",
-                "namespace": "user-tracking-namespace",
-                "cost_center": "user-tracking-test",
-                "user_id": "charlie.brown",
-                "requested_by": "david.miller",
-                "schedule": "0 9 * * 1-5"
-            }
-        )
-        print(f"   Task Creation Status Code: {response.status_code}")
-        print(f"   Task Creation Response: {json.dumps(response.json(), indent=2)}")
         
-        if response.status_code != 201:
-            print(f"   ✗ Test failed: Expected 201, got {response.status_code}")
+        if log is None:
+            lines.append("   ✗ Test failed: No log found")
             return False
         
-        task_data = response.json()
+        if VERBOSE:
+            lines.append(f"   Log: {dump_json(log)}")
         
-        # Verify created_by field in task
-        if task_data.get('created_by') == 'david.miller':
-            print("   ✓ Task has created_by field set correctly")
-        else:
-            print(f"   ✗ Test failed: created_by={task_data.get('created_by')}, expected=david.miller")
+        if (log.get('requested_by') != check.expected_user or
+                log.get('user_id') != check.expected_user or
+                (check.expected_cost_center and log.get('cost_center') != check.expected_cost_center)):
+            lines.append(f"   ✗ Test failed: requested_by={log.get('requested_by')}, expected={check.expected_user}")
             return False
         
-        # Wait for DynamoDB to process
-        time.sleep(2)
+        lines.append("   ✓ Test passed: requested_by captured correctly")
+        return True
         
-        # Query DynamoDB for task creation log
-        try:
-            query_response = table.query(
-                KeyConditionExpression='namespace_name = :ns AND timestamp_start >= :ts',
-                ExpressionAttributeValues={
-                    ':ns': 'user-tracking-namespace',
-                    ':ts': timestamp_before
-                }
-            )
-            
-            activity_logs = query_response.get('Items', [])
-            task_logs = [
-                log for log in activity_logs 
-                if log.get('operation_type') == 'task_created'
-            ]
-            
-            print(f"   Found {len(task_logs)} task creation log(s)")
-            
-            if len(task_logs) > 0:
-                log = task_logs[0]
-                print(f"   Activity Log: {json.dumps(log, indent=2, default=str)}")
-                
-                # Verify requested_by field
-                if (log.get('requested_by') == 'david.miller' and
-                    log.get('user_id') == 'david.miller'):
-                    print("   ✓ Test passed: requested_by captured correctly in task creation")
-                else:
-                    print(f"   ✗ Test failed: requested_by={log.get('requested_by')}, expected=david.miller")
-                    return False
-            else:
-                print("   ✗ Test failed: No task creation log found")
-                return False
-                
-        except Exception as e:
-            print(f"   ✗ Test failed querying DynamoDB: {e}")
-            return False
-            
     except Exception as e:
-        print(f"   ✗ Test failed with exception: {e}")
+        lines.append(f"   ✗ Test failed with exception: {e}")
         return False
+
+
+def make_session():
+    """
+    Create a keep-alive HTTP session
     
-    # Test 4: Validation with requested_by
-    print("\n4. Testing user tracking in VALIDATION...")
-    try:
-        timestamp_before = int(time.time())
-        
-        response = requests.get(
-            f"{base_url}/api/cost-centers/user-tracking-test/validate",
-            params={
-                "user_id": "emily.davis",
-                "requested_by": "frank.garcia",
-                "operation_type": "test_validation",
-                "namespace": "validation-test-ns"
-            }
-        )
-        print(f"   Validation Status Code: {response.status_code}")
-        print(f"   Validation Response: {json.dumps(response.json(), indent=2)}")
-        
-        if response.status_code != 200:
-            print(f"   ✗ Test failed: Expected 200, got {response.status_code}")
-            return False
-        
-        # Wait for DynamoDB to process
-        time.sleep(2)
-        
-        # Query DynamoDB for validation log
-        try:
-            query_response = table.query(
-                KeyConditionExpression='namespace_name = :ns AND timestamp_start >= :ts',
-                ExpressionAttributeValues={
-                    ':ns': 'validation-test-ns',
-                    ':ts': timestamp_before
-                }
-            )
-            
-            audit_logs = query_response.get('Items', [])
-            validation_logs = [
-                log for log in audit_logs 
-                if log.get('operation_type', '').startswith('validation_')
-            ]
-            
-            print(f"   Found {len(validation_logs)} validation log(s)")
-            
-            if len(validation_logs) > 0:
-                log = validation_logs[0]
-                print(f"   Validation Log: {json.dumps(log, indent=2, default=str)}")
-                
-                # Verify requested_by field
-                if (log.get('requested_by') == 'frank.garcia' and
-                    log.get('user_id') == 'frank.garcia'):
-                    print("   ✓ Test passed: requested_by captured correctly in validation")
-                else:
-                    print(f"   ✗ Test failed: requested_by={log.get('requested_by')}, expected=frank.garcia")
-                    return False
-            else:
-                print("   ✗ Test failed: No validation log found")
-                return False
-                
-        except Exception as e:
-            print(f"   ✗ Test failed querying DynamoDB: {e}")
-            return False
-            
-    except Exception as e:
-        print(f"   ✗ Test failed with exception: {e}")
-        return False
+    requests.Session is not thread-safe, so each concurrent sequence gets
+    its own; a single pooled connection is enough for one sequence.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=1,
+        max_retries=Retry(total=3, backoff_factor=0.2)
+    )
+    session.mount('http://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+
+def make_logs_table():
+    """
+    Create a logs table handle from its own boto3 session
+    
+    boto3 sessions are not thread-safe, so each concurrent sequence gets a
+    resource built from a separate session, created in the calling thread.
+    """
+    dynamodb = boto3.session.Session().resource('dynamodb', region_name='us-east-1')
+    return dynamodb.Table('task-scheduler-logs')
+
+
+def run_checks(session, base_url, table, checks):
+    """
+    Run dependent checks in order, stopping at the first failure
     
-    # Test 5: Default to 'system' when no user provided
-    print("\n5. Testing default to 'system' when no user provided...")
+    Returns:
+        (success, report lines) for the checks that were run
+    """
+    lines = []
+    for check in checks:
+        if not run_check(session, base_url, table, check, lines):
+            return False, lines
+    return True, lines
+
+
+def test_user_tracking():
+    """Test user tracking for all operations"""
+    base_url = "http://localhost:8080"
+    
+    session = make_session()
+    
+    print("Testing User Tracking in All Operations")
+    print("=" * 70)
+    
+    # Setup: Create test cost center
+    print("\nSetup: Creating test cost center...")
     try:
-        timestamp_before = int(time.time())
-        
-        response = requests.post(
-            f"{base_url}/api/namespaces/default/activate",
+        response = session.post(
+            f"{base_url}/api/cost-centers/user-tracking-test/permissions",
             json={
-                "cost_center": "user-tracking-test"
-                # No user_id or requested_by provided
+                "is_authorized": True,
+                "max_concurrent_namespaces": 5,
+                "authorized_namespaces": []
             }
         )
-        print(f"   Activation Status Code: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"   ✗ Test failed: Expected 200, got {response.status_code}")
-            return False
-        
-        # Wait for DynamoDB to process
-        time.sleep(2)
-        
-        # Query DynamoDB for activity log
-        try:
-            query_response = table.query(
-                KeyConditionExpression='namespace_name = :ns AND timestamp_start >= :ts',
-                ExpressionAttributeValues={
-                    ':ns': 'default',
-                    ':ts': timestamp_before
-                }
-            )
-            
-            activity_logs = query_response.get('Items', [])
-            activation_logs = [
-                log for log in activity_logs 
-                if log.get('operation_type') == 'manual_activation'
-            ]
-            
-            if len(activation_logs) > 0:
-                log = activation_logs[0]
-                
-                # Verify defaults to 'anonymous' (from endpoint default)
-                if log.get('requested_by') == 'anonymous':
-                    print("   ✓ Test passed: Defaults to 'anonymous' when no user provided")
-                else:
-                    print(f"   ✗ Test failed: requested_by={log.get('requested_by')}, expected=anonymous")
-                    return False
-            else:
-                print("   ✗ Test failed: No activation log found")
-                return False
-                
-        except Exception as e:
-            print(f"   ✗ Test failed querying DynamoDB: {e}")
-            return False
-            
+        print(f"   Created user-tracking-test: {response.status_code}")
     except Exception as e:
-        print(f"   ✗ Test failed with exception: {e}")
+        print(f"   Warning: Could not create user-tracking-test: {e}")
+    
+    time.sleep(2)  # Give DynamoDB time to propagate
+    
+    # Checks against the same namespace depend on each other's state and
+    # run in order; independent namespaces run concurrently
+    by_namespace = {}
+    for check in CHECKS:
+        by_namespace.setdefault(check.namespace, []).append(check)
+    sequences = list(by_namespace.values())
+    clients = [(make_session(), make_logs_table()) for _ in sequences]
+    with ThreadPoolExecutor(max_workers=len(sequences)) as executor:
+        futures = [
+            executor.submit(run_checks, sequence_session, base_url, table, checks)
+            for (sequence_session, table), checks in zip(clients, sequences)
+        ]
+        results = []
+        for future in futures:
+            success, lines = future.result()
+            print("\n".join(lines))
+            results.append(success)
+    
+    if not all(results):
         return False
     
     print("\n" + "=" * 70)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the cluster_name source verifier
+Runs the verifier against mutated copies of app.py to make sure each check
+still fails when the code it describes is removed
+"""
+
+import pytest
+import os
+import sys
+
+# Add the src directory to the path
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SRC_DIR)
+
+from verify_cluster_name_changes import verify_cluster_name_implementation
+from verify_utils import load_app_content
+
+with open(os.path.join(SRC_DIR, 'app.py')) as f:
+    APP_SOURCE = f.read()
+
+LOG_METHOD = 'def log_namespace_activity('
+
+
+def remove_in_log_method(source, line):
+    """Remove the first occurrence of line inside log_namespace_activity"""
+    start = source.index(LOG_METHOD)
+    offset = source.index(line + '\n', start)
+    return source[:offset] + source[offset + len(line) + 1:]
+
+
+def run_verifier(tmp_path, monkeypatch, source):
+    """Run the verifier on source written as app.py in tmp_path"""
+    (tmp_path / 'app.py').write_text(source)
+    monkeypatch.chdir(tmp_path)
+    load_app_content.cache_clear()
+    try:
+        return verify_cluster_name_implementation()
+    finally:
+        load_app_content.cache_clear()
+
+
+def test_current_app_passes(tmp_path, monkeypatch):
+    """Test that the verifier accepts the current app.py"""
+    assert run_verifier(tmp_path, monkeypatch, APP_SOURCE) is True
+
+
+@pytest.mark.parametrize('line', [
+    "            if cluster_name:",
+    "                item['cluster_name'] = cluster_name",
+])
+def test_missing_cluster_handling_fails(tmp_path, monkeypatch, capsys, line):
+    """Test that the similar block in _log_validation_audit does not satisfy the check"""
+    assert run_verifier(tmp_path, monkeypatch, remove_in_log_method(APP_SOURCE, line)) is False
+    assert "cluster_name handling logic not found" in capsys.readouterr().out
+
+
+def test_namespace_name_must_lead_log_call(tmp_path, monkeypatch, capsys):
+    """Test that namespace_name has to be the first argument of the logging call"""
+    call = (
+        "log_namespace_activity(\n"
+        "                        namespace_name=namespace,\n"
+        "                        operation_type='manual_activation',\n"
+    )
+    swapped = (
+        "log_namespace_activity(\n"
+        "                        operation_type='manual_activation',\n"
+        "                        namespace_name=namespace,\n"
+    )
+    assert call in APP_SOURCE
+
+    assert run_verifier(tmp_path, monkeypatch, APP_SOURCE.replace(call, swapped)) is False
+    assert "cluster_name missing in namespace activation logging" in capsys.readouterr().out
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the weekly schedule computation and cache paths
+
+Requires pytest-benchmark (requirements-dev.txt). To gate regressions, save a
+baseline and compare against it:
+    pytest test_weekly_schedule_benchmark.py --benchmark-autosave
+    pytest test_weekly_schedule_benchmark.py --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+
+import pytest
+from datetime import datetime
+import sys
+import os
+
+pytest.importorskip('pytest_benchmark')
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app
+
+WEEK_START = datetime(2024, 1, 15)  # Monday
+SCHEDULES = ['0 9 * * 1-5', '0 18 * * 1-5', '30 7 * * *', '0 */6 * * *']
+
+
+def load_tasks(scheduler, count):
+    """Populate the scheduler with count scheduled tasks across several namespaces"""
+    for i in range(count):
+        task_id = f'bench-task-{i}'
+        scheduler.tasks[task_id] = {
+            'id': task_id,
+            'title': f'Benchmark Task {i}',
+            'schedule': SCHEDULES[i % len(SCHEDULES)],
+            'namespace': f'bench-ns-{i % 20}',
+            'cost_center': f'bench-cc-{i % 5}',
+            'operation_type': 'activate' if i % 2 else 'deactivate',
+            'status': 'pending',
+            'created_by': 'benchmark'
+        }
+
+
+@pytest.mark.parametrize('task_count', [10, 100, 1000])
+def test_get_weekly_scheduled_tasks_perf(benchmark, scheduler, task_count):
+    """Benchmark weekly occurrence expansion for a growing number of tasks"""
+    load_tasks(scheduler, task_count)
+
+    # Clear the cron expansion cache before every round so each timed call
+    # goes through croniter instead of hitting the cache
+    weekly_tasks = benchmark.pedantic(
+        scheduler.get_weekly_scheduled_tasks, args=(WEEK_START,),
+        setup=app._expand_cron_in_range.cache_clear,
+        rounds=50, iterations=1, warmup_rounds=1
+    )
+
+    assert len(weekly_tasks) > 0
+
+
+def test_weekly_cache_hit_perf(benchmark, scheduler):
+    """Benchmark the weekly cache hit path"""
+    load_tasks(scheduler, 100)
+    response = scheduler.get_weekly_schedule_cached(WEEK_START)
+
+    cached = benchmark.pedantic(
+        scheduler._get_weekly_cache, args=(WEEK_START,),
+        rounds=50, iterations=10
+    )
+
+    assert cached is response
@@ -5,31 +5,49 @@ Tests the new /api/weekly-schedule/{week_start_date} endpoint functionality
 """
 
 import pytest
-import json
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 import sys
 import os
 
+try:
+    from orjson import loads
+except ImportError:  # orjson is a dev-only extra (requirements-dev.txt)
+    from json import loads
+
 # Add the src directory to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import the app and scheduler
-from app import app, scheduler
+import app as app_module
+from app import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Flask test client shared by all tests in this module"""
+    app.config['TESTING'] = True
+    with app.test_client() as test_client:
+        yield test_client
 
 class TestWeeklyScheduleEndpoint:
     """Test the weekly schedule endpoint functionality"""
     
-    def setup_method(self):
-        """Set up test environment"""
-        self.app = app.test_client()
-        self.app.testing = True
-        
-        # Clear any existing tasks and cache
-        scheduler.tasks.clear()
-        scheduler.weekly_cache.clear()
+    @pytest.fixture
+    def scheduler(self, scheduler, monkeypatch):
+        """Route the Flask app to the isolated TaskScheduler from conftest"""
+        monkeypatch.setattr(app_module, 'scheduler', scheduler)
+        return scheduler
     
-    def test_get_weekly_scheduled_tasks_empty(self):
+    @pytest.fixture(autouse=True)
+    def allow_cost_centers(self, scheduler, monkeypatch):
+        """Authorize every cost center so tasks can be added without DynamoDB"""
+        monkeypatch.setattr(
+            scheduler.dynamodb_manager, 'validate_cost_center_permissions',
+            lambda *args, **kwargs: True
+        )
+    
+    def test_get_weekly_scheduled_tasks_empty(self, scheduler):
         """Test getting weekly tasks when no tasks exist"""
         week_start = datetime(2024, 1, 15)  # Monday
         
@@ -38,7 +56,7 @@ class TestWeeklyScheduleEndpoint:
         assert isinstance(weekly_tasks, list)
         assert len(weekly_tasks) == 0
     
-    def test_get_weekly_scheduled_tasks_with_tasks(self):
+    def test_get_weekly_scheduled_tasks_with_tasks(self, scheduler):
         """Test getting weekly tasks with some scheduled tasks"""
         # Add a test task
         task_data = {
@@ -50,9 +68,7 @@ class TestWeeklyScheduleEndpoint:
             'operation_type': 'activate'
         }
         
-        # Mock the cost center validation to return True
-        with patch.object(scheduler.dynamodb_manager, 'validate_cost_center_permissions', return_value=True):
-            scheduler.add_task(task_data)
+        scheduler.add_task(task_data)
         
         week_start = datetime(2024, 1, 15)  # Monday
         weekly_tasks = scheduler.get_weekly_scheduled_tasks(week_start)
@@ -70,7 +86,25 @@ class TestWeeklyScheduleEndpoint:
             assert 'hour' in task
             assert 'minute' in task
     
-    def test_process_weekly_tasks_to_time_slots(self):
+    def test_weekly_occurrences_follow_cron_firings(self, scheduler):
+        """Test that a weekday cron yields exactly one occurrence per firing"""
+        task_data = {
+            'id': 'weekday-task',
+            'title': 'Weekday Task',
+            'schedule': '0 9 * * 1-5',  # 9 AM weekdays
+            'namespace': 'test-namespace',
+            'cost_center': 'test-center',
+            'operation_type': 'activate'
+        }
+        
+        scheduler.add_task(task_data)
+        
+        weekly_tasks = scheduler.get_weekly_scheduled_tasks(datetime(2024, 1, 15))
+        
+        assert [task['day_of_week'] for task in weekly_tasks] == [0, 1, 2, 3, 4]
+        assert all(task['hour'] == 9 and task['minute'] == 0 for task in weekly_tasks)
+    
+    def test_process_weekly_tasks_to_time_slots(self, scheduler):
         """Test processing weekly tasks into time slots"""
         # Create sample weekly tasks
         weekly_tasks = [
@@ -100,7 +134,7 @@ class TestWeeklyScheduleEndpoint:
         assert task_slot['namespace_name'] == 'test-ns'
         assert task_slot['cost_center'] == 'test-cc'
     
-    def test_format_weekly_schedule_response(self):
+    def test_format_weekly_schedule_response(self, scheduler):
         """Test formatting weekly schedule response"""
         week_start = datetime(2024, 1, 15)
         time_slots = {
@@ -142,8 +176,11 @@ class TestWeeklyScheduleEndpoint:
         assert 'total_tasks' in metadata
         assert 'active_namespaces' in metadata
         assert 'cost_centers' in metadata
+        assert metadata['total_tasks'] == 1
+        assert metadata['active_namespaces'] == ['test-ns']
+        assert metadata['cost_centers'] == ['test-cc']
     
-    def test_weekly_cache_functionality(self):
+    def test_weekly_cache_functionality(self, scheduler):
         """Test weekly cache get/put functionality"""
         week_start = datetime(2024, 1, 15)
         test_data = {'test': 'data'}
@@ -164,8 +201,24 @@ class TestWeeklyScheduleEndpoint:
         assert stats['enabled'] is True
         assert stats['cached_entries'] == 1
     
-    @patch.object(scheduler.dynamodb_manager, 'validate_cost_center_permissions', return_value=True)
-    def test_weekly_schedule_api_endpoint(self, mock_validate):
+    def test_weekly_cache_evicts_least_recently_used(self, scheduler):
+        """Test that the weekly cache stays within its size cap"""
+        scheduler.weekly_cache_max_entries = 2
+        weeks = [datetime(2024, 1, 1) + timedelta(weeks=i) for i in range(3)]
+        
+        scheduler._put_weekly_cache(weeks[0], {'week': 0})
+        scheduler._put_weekly_cache(weeks[1], {'week': 1})
+        
+        # Touch the oldest entry so the second week becomes least recently used
+        assert scheduler._get_weekly_cache(weeks[0]) == {'week': 0}
+        scheduler._put_weekly_cache(weeks[2], {'week': 2})
+        
+        assert len(scheduler.weekly_cache) == 2
+        assert scheduler._get_weekly_cache(weeks[1]) is None
+        assert scheduler._get_weekly_cache(weeks[0]) == {'week': 0}
+        assert scheduler._get_weekly_cache(weeks[2]) == {'week': 2}
+    
+    def test_weekly_schedule_api_endpoint(self, scheduler, client):
         """Test the API endpoint for weekly schedule"""
         # Add a test task
         task_data = {
@@ -180,11 +233,11 @@ class TestWeeklyScheduleEndpoint:
         scheduler.add_task(task_data)
         
         # Test the API endpoint
-        response = self.app.get('/api/weekly-schedule/2024-01-15')
+        response = client.get('/api/weekly-schedule/2024-01-15')
         
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = loads(response.data)
         assert 'success' in data
         assert 'data' in data
         
@@ -193,44 +246,44 @@ class TestWeeklyScheduleEndpoint:
             assert 'time_slots' in data['data']
             assert 'metadata' in data['data']
     
-    def test_weekly_schedule_api_invalid_date(self):
+    def test_weekly_schedule_api_invalid_date(self, scheduler, client):
         """Test API endpoint with invalid date format"""
-        response = self.app.get('/api/weekly-schedule/invalid-date')
+        response = client.get('/api/weekly-schedule/invalid-date')
         
         assert response.status_code == 400
         
-        data = json.loads(response.data)
+        data = loads(response.data)
         assert data['success'] is False
         assert 'error' in data
     
-    def test_weekly_cache_stats_endpoint(self):
+    def test_weekly_cache_stats_endpoint(self, scheduler, client):
         """Test the weekly cache stats API endpoint"""
-        response = self.app.get('/api/weekly-schedule/cache/stats')
+        response = client.get('/api/weekly-schedule/cache/stats')
         
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = loads(response.data)
         assert 'enabled' in data
         assert 'cached_entries' in data
     
-    def test_weekly_cache_invalidate_endpoint(self):
+    def test_weekly_cache_invalidate_endpoint(self, scheduler, client):
         """Test the weekly cache invalidate API endpoint"""
         # Test invalidating all cache
-        response = self.app.post('/api/weekly-schedule/cache/invalidate',
-                               json={})
+        response = client.post('/api/weekly-schedule/cache/invalidate',
+                             json={})
         
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = loads(response.data)
         assert 'message' in data
         
         # Test invalidating specific week
-        response = self.app.post('/api/weekly-schedule/cache/invalidate',
-                               json={'week_start_date': '2024-01-15'})
+        response = client.post('/api/weekly-schedule/cache/invalidate',
+                             json={'week_start_date': '2024-01-15'})
         
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = loads(response.data)
         assert 'message' in data
 
 if __name__ == '__main__':
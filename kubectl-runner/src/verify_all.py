@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Run the source verification scripts together
+Set VERIFY_WORKERS above 1 to run the verifiers in a process pool; reports are
+printed in order, stopping at the first failure
+"""
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from verify_audit_endpoints import verify_audit_endpoints_implementation
+from verify_business_hours import verify_business_hours_implementation
+from verify_cluster_name_changes import verify_cluster_name_implementation
+from verify_namespace_counting import verify_namespace_counting_implementation
+
+VERIFY_WORKERS = int(os.getenv('VERIFY_WORKERS', '1'))
+
+VERIFIERS = (
+    ('audit endpoints', verify_audit_endpoints_implementation),
+    ('business hours', verify_business_hours_implementation),
+    ('cluster name', verify_cluster_name_implementation),
+    ('namespace counting', verify_namespace_counting_implementation),
+)
+
+def run_verifier(verifier):
+    """Run a verifier and return (success, report) with its printed output captured"""
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        success = verifier()
+    return success, report.getvalue()
+
+def verify_all(max_workers=VERIFY_WORKERS):
+    """Run every verifier, printing reports in order up to the first failure"""
+    verifiers = [verifier for _, verifier in VERIFIERS]
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run_verifier, verifiers))
+    else:
+        results = map(run_verifier, verifiers)
+
+    for (name, _), (success, report) in zip(VERIFIERS, results):
+        print(report)
+        if not success:
+            print(f"✗ {name} verification failed")
+            return False
+    return True
+
+if __name__ == "__main__":
+    try:
+        success = verify_all()
+        exit_code = 0 if success else 1
+        print(f"\nVerification {'PASSED' if success else 'FAILED'}")
+        exit(exit_code)
+    except Exception as e:
+        print(f"\nVerification failed with exception: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
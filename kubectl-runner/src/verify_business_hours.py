@@ -7,6 +7,73 @@ This script analyzes the source code to verify the changes without running the a
 import os
 import re
 
+from verify_utils import find_literals, load_app_content, run_checks, section_literals
+
+_INFO_FIELDS = (
+    'current_time', 'timezone', 'business_hours', 'business_days',
+    'holidays', 'is_non_business_hours', 'current_weekday', 'current_hour'
+)
+_INFO_FIELD_RE = re.compile(rb"'(" + rb"|".join(re.escape(field.encode()) for field in _INFO_FIELDS) + rb")'")
+
+def _missing_info_fields(found_info_fields):
+    """Return the info fields whose quoted key was not found in app.py"""
+    return [field for field in _INFO_FIELDS if field not in found_info_fields]
+
+_BUSINESS_HOURS_SECTIONS = (
+    ("1. Checking timezone support...", (
+        ("pytz import found", "pytz import not found",
+         'import pytz'),
+        ("Timezone configuration support found", "Timezone configuration not found",
+         'BUSINESS_HOURS_TIMEZONE'),
+        ("Timezone object creation found", "Timezone object creation not found",
+         'pytz.timezone(timezone_name)'),
+    )),
+    ("2. Checking configurable business hours...", (
+        ("Configurable business hours found", "Configurable business hours not found",
+         ('BUSINESS_START_HOUR', 'BUSINESS_END_HOUR')),
+        ("Business hours validation found", "Business hours validation not found",
+         'if not (0 <= business_start_hour <= 23)'),
+    )),
+    ("3. Checking holiday support...", (
+        ("Holiday checking method found", "Holiday checking method not found",
+         'def _is_holiday(self, current_time):'),
+        ("Holiday configuration support found", "Holiday configuration not found",
+         'BUSINESS_HOLIDAYS'),
+    )),
+    ("4. Checking enhanced logging...", (
+        ("Debug logging for business hours found", "Debug logging not found",
+         'logger.debug(f"Business hours check:'),
+        ("Holiday logging found", "Holiday logging not found",
+         'logger.info(f"Current date {current_date} is a configured holiday")'),
+    )),
+    ("5. Checking business hours info method...", (
+        ("Business hours info method found", "Business hours info method not found",
+         'def get_business_hours_info(self):'),
+        ("All business hours info fields found",
+         lambda found, info_fields: f"Missing info fields: {_missing_info_fields(info_fields)}",
+         lambda found, info_fields: not _missing_info_fields(info_fields)),
+    )),
+    ("6. Checking API endpoint...", (
+        ("Business hours API endpoint found", "Business hours API endpoint not found",
+         "@app.route('/api/business-hours', methods=['GET'])"),
+        ("Business hours endpoint function found", "Business hours endpoint function not found",
+         'def get_business_hours():'),
+    )),
+    ("7. Checking error handling...", (
+        ("Timezone error handling found", "Timezone error handling not found",
+         'except pytz.exceptions.UnknownTimeZoneError:'),
+        ("Timezone warning logging found", "Timezone warning logging not found",
+         'logger.warning(f"Unknown timezone'),
+    )),
+    ("8. Checking timestamp handling...", (
+        ("Datetime object handling found", "Datetime object handling not found",
+         'elif isinstance(timestamp, datetime):'),
+        ("Timezone conversion found", "Timezone conversion not found",
+         'astimezone(business_timezone)'),
+    )),
+)
+_BUSINESS_HOURS_LITERALS = section_literals(_BUSINESS_HOURS_SECTIONS)
+
 def verify_business_hours_implementation():
     """Verify that business hours detection is properly implemented"""
     print("Verifying Business Hours Detection Implementation")
@@ -18,145 +85,11 @@ def verify_business_hours_implementation():
         print(f"✗ {app_file} not found")
         return False
     
-    with open(app_file, 'r') as f:
-        content = f.read()
-    
-    # Test 1: Verify timezone support
-    print("\n1. Checking timezone support...")
-    
-    if 'import pytz' in content:
-        print("   ✓ pytz import found")
-    else:
-        print("   ✗ pytz import not found")
-        return False
-    
-    if 'BUSINESS_HOURS_TIMEZONE' in content:
-        print("   ✓ Timezone configuration support found")
-    else:
-        print("   ✗ Timezone configuration not found")
-        return False
-    
-    if 'pytz.timezone(timezone_name)' in content:
-        print("   ✓ Timezone object creation found")
-    else:
-        print("   ✗ Timezone object creation not found")
-        return False
-    
-    # Test 2: Verify configurable business hours
-    print("\n2. Checking configurable business hours...")
-    
-    if 'BUSINESS_START_HOUR' in content and 'BUSINESS_END_HOUR' in content:
-        print("   ✓ Configurable business hours found")
-    else:
-        print("   ✗ Configurable business hours not found")
-        return False
-    
-    # Check validation of business hours
-    if 'if not (0 <= business_start_hour <= 23)' in content:
-        print("   ✓ Business hours validation found")
-    else:
-        print("   ✗ Business hours validation not found")
-        return False
-    
-    # Test 3: Verify holiday support
-    print("\n3. Checking holiday support...")
-    
-    if 'def _is_holiday(self, current_time):' in content:
-        print("   ✓ Holiday checking method found")
-    else:
-        print("   ✗ Holiday checking method not found")
-        return False
-    
-    if 'BUSINESS_HOLIDAYS' in content:
-        print("   ✓ Holiday configuration support found")
-    else:
-        print("   ✗ Holiday configuration not found")
-        return False
-    
-    # Test 4: Verify enhanced logging
-    print("\n4. Checking enhanced logging...")
-    
-    if 'logger.debug(f"Business hours check:' in content:
-        print("   ✓ Debug logging for business hours found")
-    else:
-        print("   ✗ Debug logging not found")
-        return False
+    content = load_app_content(app_file)
+    found = find_literals(content, _BUSINESS_HOURS_LITERALS)
+    found_info_fields = {match.group(1).decode() for match in _INFO_FIELD_RE.finditer(content)}
     
-    if 'logger.info(f"Current date {current_date} is a configured holiday")' in content:
-        print("   ✓ Holiday logging found")
-    else:
-        print("   ✗ Holiday logging not found")
-        return False
-    
-    # Test 5: Verify business hours info method
-    print("\n5. Checking business hours info method...")
-    
-    if 'def get_business_hours_info(self):' in content:
-        print("   ✓ Business hours info method found")
-    else:
-        print("   ✗ Business hours info method not found")
-        return False
-    
-    # Check for comprehensive info fields
-    info_fields = [
-        'current_time', 'timezone', 'business_hours', 'business_days',
-        'holidays', 'is_non_business_hours', 'current_weekday', 'current_hour'
-    ]
-    
-    missing_info_fields = []
-    for field in info_fields:
-        if f"'{field}'" not in content:
-            missing_info_fields.append(field)
-    
-    if not missing_info_fields:
-        print("   ✓ All business hours info fields found")
-    else:
-        print(f"   ✗ Missing info fields: {missing_info_fields}")
-        return False
-    
-    # Test 6: Verify API endpoint
-    print("\n6. Checking API endpoint...")
-    
-    if "@app.route('/api/business-hours', methods=['GET'])" in content:
-        print("   ✓ Business hours API endpoint found")
-    else:
-        print("   ✗ Business hours API endpoint not found")
-        return False
-    
-    if 'def get_business_hours():' in content:
-        print("   ✓ Business hours endpoint function found")
-    else:
-        print("   ✗ Business hours endpoint function not found")
-        return False
-    
-    # Test 7: Verify error handling
-    print("\n7. Checking error handling...")
-    
-    if 'except pytz.exceptions.UnknownTimeZoneError:' in content:
-        print("   ✓ Timezone error handling found")
-    else:
-        print("   ✗ Timezone error handling not found")
-        return False
-    
-    if 'logger.warning(f"Unknown timezone' in content:
-        print("   ✓ Timezone warning logging found")
-    else:
-        print("   ✗ Timezone warning logging not found")
-        return False
-    
-    # Test 8: Verify timestamp handling
-    print("\n8. Checking timestamp handling...")
-    
-    if 'elif isinstance(timestamp, datetime):' in content:
-        print("   ✓ Datetime object handling found")
-    else:
-        print("   ✗ Datetime object handling not found")
-        return False
-    
-    if 'astimezone(business_timezone)' in content:
-        print("   ✓ Timezone conversion found")
-    else:
-        print("   ✗ Timezone conversion not found")
+    if not run_checks(_BUSINESS_HOURS_SECTIONS, found, found_info_fields):
         return False
     
     # Test 9: Check requirements.txt
@@ -164,10 +97,10 @@ def verify_business_hours_implementation():
     
     requirements_file = '../requirements.txt'
     if os.path.exists(requirements_file):
-        with open(requirements_file, 'r') as f:
+        with open(requirements_file, 'rb') as f:
             requirements_content = f.read()
         
-        if 'pytz' in requirements_content:
+        if b'pytz' in requirements_content:
             print("   ✓ pytz dependency found in requirements.txt")
         else:
             print("   ✗ pytz dependency not found in requirements.txt")
@@ -180,10 +113,10 @@ def verify_business_hours_implementation():
     
     dockerfile_path = '../Dockerfile'
     if os.path.exists(dockerfile_path):
-        with open(dockerfile_path, 'r') as f:
+        with open(dockerfile_path, 'rb') as f:
             dockerfile_content = f.read()
         
-        if 'pytz' in dockerfile_content:
+        if b'pytz' in dockerfile_content:
             print("   ✓ pytz dependency found in Dockerfile")
         else:
             print("   ✗ pytz dependency not found in Dockerfile")
@@ -7,6 +7,73 @@ This script analyzes the source code to verify the changes without running the a
 import os
 import re
 
+from verify_utils import find_literals, find_patterns, load_app_content, run_checks, section_literals
+
+_CLUSTER_NAME_INIT = "self.cluster_name = os.getenv('EKS_CLUSTER_NAME', 'unknown-cluster')"
+# Call checks match at each call's opening parenthesis: the named arguments
+# must follow it directly, and [^)]*? keeps the rest of the match inside the
+# call's argument list
+_LOG_CALL = 'log_namespace_activity('
+_VALIDATION_CALL = 'validate_cost_center_permissions('
+_CLUSTER_NAME_PATTERNS = {
+    'task_creation': (_LOG_CALL, re.compile(
+        rb"log_namespace_activity\(\s*namespace_name=self\.tasks\[task_id\]\['namespace'\],\s*"
+        rb"operation_type='task_created',[^)]*?cluster_name=self\.cluster_name")),
+    'activation': (_LOG_CALL, re.compile(
+        rb"log_namespace_activity\(\s*namespace_name=namespace,\s*"
+        rb"operation_type='manual_activation',[^)]*?cluster_name=self\.cluster_name")),
+    'deactivation': (_LOG_CALL, re.compile(
+        rb"log_namespace_activity\(\s*namespace_name=namespace,\s*"
+        rb"operation_type='manual_deactivation',[^)]*?cluster_name=self\.cluster_name")),
+    'validation_self': (_VALIDATION_CALL, re.compile(
+        rb"validate_cost_center_permissions\(\s*cost_center,[^)]*?cluster_name=self\.cluster_name")),
+    'validation_scheduler': (_VALIDATION_CALL, re.compile(
+        rb"validate_cost_center_permissions\(\s*cost_center,[^)]*?cluster_name=scheduler\.cluster_name")),
+    'scheduler_task': re.compile(rb'requested_by=f"scheduler-task-\{task_id\}"'),
+    'log_method': ('def log_namespace_activity(', re.compile(rb'def log_namespace_activity\(self, namespace_name, operation_type, cost_center, user_id=None, requested_by=None, cluster_name=None')),
+    # The handling block must be in log_namespace_activity itself: the lazy
+    # line skip only crosses blank lines and lines indented as method body
+    'cluster_handling': ('def log_namespace_activity(', re.compile(
+        rb"def log_namespace_activity\([^\n]*\n(?:(?:[ \t]{8}[^\n]*)?\n)*?"
+        rb"[ \t]+if cluster_name:\s*item\['cluster_name'\] = cluster_name\s*else:\s*"
+        rb"(?:#[^\n]*\s*)*item\['cluster_name'\] = os\.getenv\('EKS_CLUSTER_NAME', 'unknown-cluster'\)")),
+    'audit_method': ('def _log_validation_audit(', re.compile(rb'def _log_validation_audit\(self, validation_type, cost_center, validation_result,\s*validation_source, user_id=None, requested_by=None, operation_type=None,\s*namespace=None, cluster_name=None', re.DOTALL))
+}
+
+_CLUSTER_NAME_SECTIONS = (
+    ("1. Checking cluster_name initialization in TaskScheduler...", (
+        ("cluster_name properly initialized from environment variable", "cluster_name initialization not found",
+         _CLUSTER_NAME_INIT),
+    )),
+    ("2. Checking cluster_name in log_namespace_activity calls...", (
+        ("cluster_name passed in task creation logging", "cluster_name missing in task creation logging",
+         lambda found, matched: 'task_creation' in matched),
+        ("cluster_name passed in namespace activation logging", "cluster_name missing in namespace activation logging",
+         lambda found, matched: 'activation' in matched),
+        ("cluster_name passed in namespace deactivation logging", "cluster_name missing in namespace deactivation logging",
+         lambda found, matched: 'deactivation' in matched),
+    )),
+    ("3. Checking cluster_name in validation calls...", (
+        ("cluster_name passed in validation calls", "cluster_name missing in validation calls",
+         lambda found, matched: 'validation_self' in matched or 'validation_scheduler' in matched),
+    )),
+    ("4. Checking scheduled task execution improvements...", (
+        ("Scheduled tasks properly identified with task ID", "Scheduled task identification not found",
+         lambda found, matched: 'scheduler_task' in matched),
+    )),
+    ("5. Checking DynamoDB logging methods...", (
+        ("log_namespace_activity method accepts cluster_name parameter", "log_namespace_activity method signature incorrect",
+         lambda found, matched: 'log_method' in matched),
+        ("cluster_name properly handled in logging method", "cluster_name handling logic not found",
+         lambda found, matched: 'cluster_handling' in matched),
+    )),
+    ("6. Checking validation audit logging...", (
+        ("_log_validation_audit method accepts cluster_name parameter", "_log_validation_audit method signature incorrect",
+         lambda found, matched: 'audit_method' in matched),
+    )),
+)
+_CLUSTER_NAME_LITERALS = section_literals(_CLUSTER_NAME_SECTIONS)
+
 def verify_cluster_name_implementation():
     """Verify that cluster_name is properly implemented in all operations"""
     print("Verifying Cluster Name Implementation")
@@ -18,104 +85,11 @@ def verify_cluster_name_implementation():
         print(f"✗ {app_file} not found")
         return False
     
-    with open(app_file, 'r') as f:
-        content = f.read()
-    
-    # Test 1: Verify cluster_name is initialized in TaskScheduler
-    print("\n1. Checking cluster_name initialization in TaskScheduler...")
-    if 'self.cluster_name = os.getenv(\'EKS_CLUSTER_NAME\', \'unknown-cluster\')' in content:
-        print("   ✓ cluster_name properly initialized from environment variable")
-    else:
-        print("   ✗ cluster_name initialization not found")
-        return False
-    
-    # Test 2: Verify cluster_name is passed in log_namespace_activity calls
-    print("\n2. Checking cluster_name in log_namespace_activity calls...")
-    
-    # Check task creation logging
-    task_creation_pattern = r'log_namespace_activity\(\s*namespace_name=self\.tasks\[task_id\]\[\'namespace\'\],\s*operation_type=\'task_created\',.*?cluster_name=self\.cluster_name'
-    if re.search(task_creation_pattern, content, re.DOTALL):
-        print("   ✓ cluster_name passed in task creation logging")
-    else:
-        print("   ✗ cluster_name missing in task creation logging")
-        return False
-    
-    # Check namespace activation logging
-    activation_pattern = r'log_namespace_activity\(\s*namespace_name=namespace,\s*operation_type=\'manual_activation\',.*?cluster_name=self\.cluster_name'
-    if re.search(activation_pattern, content, re.DOTALL):
-        print("   ✓ cluster_name passed in namespace activation logging")
-    else:
-        print("   ✗ cluster_name missing in namespace activation logging")
-        return False
-    
-    # Check namespace deactivation logging
-    deactivation_pattern = r'log_namespace_activity\(\s*namespace_name=namespace,\s*operation_type=\'manual_deactivation\',.*?cluster_name=self\.cluster_name'
-    if re.search(deactivation_pattern, content, re.DOTALL):
-        print("   ✓ cluster_name passed in namespace deactivation logging")
-    else:
-        print("   ✗ cluster_name missing in namespace deactivation logging")
-        return False
-    
-    # Test 3: Verify cluster_name is passed in validation calls
-    print("\n3. Checking cluster_name in validation calls...")
-    
-    # Check validate_cost_center_permissions calls
-    validation_patterns = [
-        r'validate_cost_center_permissions\(\s*cost_center,.*?cluster_name=self\.cluster_name',
-        r'validate_cost_center_permissions\(\s*cost_center,.*?cluster_name=scheduler\.cluster_name'
-    ]
-    
-    validation_found = False
-    for pattern in validation_patterns:
-        if re.search(pattern, content, re.DOTALL):
-            validation_found = True
-            break
-    
-    if validation_found:
-        print("   ✓ cluster_name passed in validation calls")
-    else:
-        print("   ✗ cluster_name missing in validation calls")
-        return False
-    
-    # Test 4: Verify scheduled task execution improvements
-    print("\n4. Checking scheduled task execution improvements...")
-    
-    # Check that scheduled tasks have proper requested_by identification
-    scheduler_task_pattern = r'requested_by=f"scheduler-task-\{task_id\}"'
-    if re.search(scheduler_task_pattern, content):
-        print("   ✓ Scheduled tasks properly identified with task ID")
-    else:
-        print("   ✗ Scheduled task identification not found")
-        return False
-    
-    # Test 5: Verify DynamoDB logging methods handle cluster_name
-    print("\n5. Checking DynamoDB logging methods...")
-    
-    # Check log_namespace_activity method signature
-    log_method_pattern = r'def log_namespace_activity\(self, namespace_name, operation_type, cost_center, user_id=None, requested_by=None, cluster_name=None'
-    if re.search(log_method_pattern, content):
-        print("   ✓ log_namespace_activity method accepts cluster_name parameter")
-    else:
-        print("   ✗ log_namespace_activity method signature incorrect")
-        return False
-    
-    # Check cluster_name handling in the method
-    cluster_handling_pattern = r'if cluster_name:\s*item\[\'cluster_name\'\] = cluster_name\s*else:\s*.*item\[\'cluster_name\'\] = os\.getenv\(\'EKS_CLUSTER_NAME\', \'unknown-cluster\'\)'
-    if re.search(cluster_handling_pattern, content, re.DOTALL):
-        print("   ✓ cluster_name properly handled in logging method")
-    else:
-        print("   ✗ cluster_name handling logic not found")
-        return False
-    
-    # Test 6: Check validation audit logging
-    print("\n6. Checking validation audit logging...")
+    content = load_app_content(app_file)
+    found = find_literals(content, _CLUSTER_NAME_LITERALS)
+    matched = find_patterns(content, _CLUSTER_NAME_PATTERNS)
     
-    # Check _log_validation_audit method signature
-    audit_method_pattern = r'def _log_validation_audit\(self, validation_type, cost_center, validation_result,\s*validation_source, user_id=None, requested_by=None, operation_type=None,\s*namespace=None, cluster_name=None'
-    if re.search(audit_method_pattern, content, re.DOTALL):
-        print("   ✓ _log_validation_audit method accepts cluster_name parameter")
-    else:
-        print("   ✗ _log_validation_audit method signature incorrect")
+    if not run_checks(_CLUSTER_NAME_SECTIONS, found, matched):
         return False
     
     print("\n" + "=" * 50)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the verify_* scripts that analyze app.py source code
+"""
+
+import functools
+import mmap
+import os
+import sys
+
+_PREFIX_LEN = 8
+_SEQUENCE_WINDOW = 500
+
+
+@functools.lru_cache(maxsize=1)
+def load_app_content(path='app.py'):
+    """Map a source file read-only as bytes, once per process
+
+    The mapping stays open for the life of the process, so verifiers run
+    from the same interpreter share a single mapping of app.py.
+    """
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def find_literals(content, needles):
+    """Return a frozenset of the fixed-string needles that occur in content
+
+    content is a bytes-like buffer such as load_app_content() returns; needles
+    are ASCII strings and are returned as given. Needles sharing their
+    first _PREFIX_LEN characters are resolved together: only occurrences
+    of the group's common prefix are visited, and each pending needle is
+    compared in place at those offsets.
+    """
+    groups = {}
+    for needle in set(needles):
+        groups.setdefault(needle[:_PREFIX_LEN], []).append(needle.encode())
+    
+    found = set()
+    for group in groups.values():
+        if len(group) == 1:
+            if content.find(group[0]) != -1:
+                found.add(group[0])
+            continue
+        
+        prefix = os.path.commonprefix(group)
+        pending = set(group)
+        offset = content.find(prefix)
+        while offset != -1 and pending:
+            for needle in [n for n in pending if content[offset:offset + len(n)] == n]:
+                pending.discard(needle)
+                found.add(needle)
+            offset = content.find(prefix, offset + 1)
+    
+    return frozenset(needle.decode() for needle in found)
+
+
+def find_patterns(content, patterns):
+    """Return the names of the compiled patterns that match somewhere in content
+
+    patterns maps a check name to a compiled bytes regex, or to an
+    (anchor, regex) pair. A paired regex is only tried with match() at the
+    offsets where its literal anchor occurs, such as the 'def name(' that
+    starts a method signature, instead of being searched across content.
+    """
+    matched = set()
+    for name, pattern in patterns.items():
+        if not isinstance(pattern, tuple):
+            if pattern.search(content):
+                matched.add(name)
+            continue
+        
+        anchor, regex = pattern
+        anchor = anchor.encode()
+        offset = content.find(anchor)
+        while offset != -1:
+            if regex.match(content, offset):
+                matched.add(name)
+                break
+            offset = content.find(anchor, offset + 1)
+    return matched
+
+
+def find_sequences(content, sequences, window=_SEQUENCE_WINDOW):
+    """Return the names of the anchored sequences that occur in content
+
+    sequences maps a check name to an (anchor, parts) pair of strings. A
+    sequence matches when, after some occurrence of anchor, every part is
+    found in order within window bytes of the anchor. This bounds what a
+    DOTALL `.*?` regex would otherwise scan to a fixed window per anchor.
+    """
+    matched = set()
+    for name, (anchor, parts) in sequences.items():
+        anchor = anchor.encode()
+        parts = [part.encode() for part in parts]
+        offset = content.find(anchor)
+        while offset != -1:
+            end = offset + window
+            position = offset + len(anchor)
+            for part in parts:
+                position = content.find(part, position, end)
+                if position == -1:
+                    break
+                position += len(part)
+            else:
+                matched.add(name)
+                break
+            offset = content.find(anchor, offset + 1)
+    return matched
+
+
+def _required_needles(check):
+    """Return the fixed-string needles a check requires, or None for a predicate"""
+    if isinstance(check, str):
+        return (check,)
+    if isinstance(check, tuple):
+        return check
+    return None
+
+
+def section_literals(sections):
+    """Return every fixed-string needle required by the checks in sections"""
+    needles = []
+    for _, checks in sections:
+        for _, _, check in checks:
+            for needle in _required_needles(check) or ():
+                if needle not in needles:
+                    needles.append(needle)
+    return tuple(needles)
+
+
+def run_checks(sections, found, *args):
+    """Run (title, checks) sections in order, stopping at the first failed check
+
+    Each check is a (passed_message, failed_message, check) tuple. check is
+    a needle or tuple of needles that must all be in found, or a predicate
+    called with found and args. failed_message may be a callable taking the
+    same arguments. The report is buffered and written to stdout once.
+    Returns True when every check passed.
+    """
+    lines = []
+    passed = True
+    for title, checks in sections:
+        lines.append(f"\n{title}")
+        for passed_message, failed_message, check in checks:
+            needles = _required_needles(check)
+            if needles is None:
+                passed = check(found, *args)
+            else:
+                passed = all(needle in found for needle in needles)
+            if not passed:
+                if callable(failed_message):
+                    failed_message = failed_message(found, *args)
+                lines.append(f"   ✗ {failed_message}")
+                break
+            lines.append(f"   ✓ {passed_message}")
+        if not passed:
+            break
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    return passed
@@ -12,15 +12,31 @@ Uso:
 
 import boto3
 import argparse
+import random
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 
-def create_cost_center_permissions_table(environment='production'):
+# Sesión y región resueltas una sola vez: cada boto3.Session() vuelve a leer
+# la configuración y las credenciales. Los clientes se crean a partir de ella
+_SESSION = boto3.Session()
+_REGION = _SESSION.region_name
+
+# Espera de creación de tablas: el waiter por defecto consulta cada 20s. Se
+# consulta cada 2s manteniendo el límite total por defecto (20s x 25 = 500s)
+TABLE_WAITER_CONFIG = {'Delay': 2, 'MaxAttempts': 250}
+
+# Sondeo de los GSI: backoff exponencial con jitter, de 1s hasta 10s entre consultas
+GSI_POLL_INITIAL_DELAY = 1.0
+GSI_POLL_MAX_DELAY = 10.0
+
+def create_cost_center_permissions_table(environment='production', dynamodb=None):
     """
     Crea la tabla cost-center-permissions para validación de centros de costo
     """
-    dynamodb = boto3.client('dynamodb')
+    if dynamodb is None:
+        dynamodb = _SESSION.client('dynamodb')
     table_name = f'cost-center-permissions-{environment}'
     
     table_definition = {
@@ -56,21 +72,23 @@ def create_cost_center_permissions_table(environment='production'):
         
         print("⏳ Esperando que la tabla esté activa...")
         waiter = dynamodb.get_waiter('table_exists')
-        waiter.wait(TableName=table_name)
+        waiter.wait(TableName=table_name, WaiterConfig=TABLE_WAITER_CONFIG)
         
         print("✅ Tabla creada exitosamente")
         
         # Mostrar información de la tabla
         table_info = dynamodb.describe_table(TableName=table_name)['Table']
-        print(f"\n📊 Información de la tabla:")
-        print(f"   Nombre: {table_info['TableName']}")
-        print(f"   Estado: {table_info['TableStatus']}")
-        print(f"   ARN: {table_info['TableArn']}")
-        print(f"   Modo de facturación: {table_info.get('BillingModeSummary', {}).get('BillingMode', 'N/A')}")
+        summary = []
+        summary.append(f"\n📊 Información de la tabla:")
+        summary.append(f"   Nombre: {table_info['TableName']}")
+        summary.append(f"   Estado: {table_info['TableStatus']}")
+        summary.append(f"   ARN: {table_info['TableArn']}")
+        summary.append(f"   Modo de facturación: {table_info.get('BillingModeSummary', {}).get('BillingMode', 'N/A')}")
         
-        print(f"\n🔍 Estructura:")
-        print(f"   - Índice principal: cost_center (HASH)")
-        print(f"   - Atributos: is_authorized, max_concurrent_namespaces, authorized_namespaces")
+        summary.append(f"\n🔍 Estructura:")
+        summary.append(f"   - Índice principal: cost_center (HASH)")
+        summary.append(f"   - Atributos: is_authorized, max_concurrent_namespaces, authorized_namespaces")
+        print("\n".join(summary))
         
         return table_name
         
@@ -86,11 +104,12 @@ def create_cost_center_permissions_table(environment='production'):
         print(f"❌ Error inesperado: {e}")
         sys.exit(1)
 
-def create_task_scheduler_logs_table(environment='production'):
+def create_task_scheduler_logs_table(environment='production', dynamodb=None):
     """
     Crea la tabla task-scheduler-logs con los índices apropiados
     """
-    dynamodb = boto3.client('dynamodb')
+    if dynamodb is None:
+        dynamodb = _SESSION.client('dynamodb')
     table_name = f'task-scheduler-logs-{environment}'
     
     table_definition = {
@@ -223,10 +242,11 @@ def create_task_scheduler_logs_table(environment='production'):
         
         print("⏳ Esperando que la tabla esté activa...")
         waiter = dynamodb.get_waiter('table_exists')
-        waiter.wait(TableName=table_name)
+        waiter.wait(TableName=table_name, WaiterConfig=TABLE_WAITER_CONFIG)
         
         # Esperar a que los GSI estén activos
         print("⏳ Esperando que los índices estén activos...")
+        delay = GSI_POLL_INITIAL_DELAY
         while True:
             table_description = dynamodb.describe_table(TableName=table_name)
             table_status = table_description['Table']['TableStatus']
@@ -240,29 +260,32 @@ def create_task_scheduler_logs_table(environment='production'):
                     break
             
             print("   Esperando...")
-            time.sleep(10)
+            time.sleep(delay * random.uniform(0.8, 1.0))
+            delay = min(delay * 1.5, GSI_POLL_MAX_DELAY)
         
         print("✅ Tabla creada exitosamente")
         
-        # Mostrar información de la tabla
-        table_info = dynamodb.describe_table(TableName=table_name)['Table']
-        print(f"\n📊 Información de la tabla:")
-        print(f"   Nombre: {table_info['TableName']}")
-        print(f"   Estado: {table_info['TableStatus']}")
-        print(f"   ARN: {table_info['TableArn']}")
-        print(f"   Modo de facturación: {table_info.get('BillingModeSummary', {}).get('BillingMode', 'N/A')}")
+        # Mostrar información de la tabla con la última descripción del sondeo
+        table_info = table_description['Table']
+        summary = []
+        summary.append(f"\n📊 Información de la tabla:")
+        summary.append(f"   Nombre: {table_info['TableName']}")
+        summary.append(f"   Estado: {table_info['TableStatus']}")
+        summary.append(f"   ARN: {table_info['TableArn']}")
+        summary.append(f"   Modo de facturación: {table_info.get('BillingModeSummary', {}).get('BillingMode', 'N/A')}")
         
-        print(f"\n🔍 Índices creados:")
-        print(f"   - Índice principal: namespace_name (HASH) + timestamp_start (RANGE)")
+        summary.append(f"\n🔍 Índices creados:")
+        summary.append(f"   - Índice principal: namespace_name (HASH) + timestamp_start (RANGE)")
         
         if 'GlobalSecondaryIndexes' in table_info:
             for gsi in table_info['GlobalSecondaryIndexes']:
                 key_schema = ' + '.join([f"{key['AttributeName']} ({key['KeyType']})" for key in gsi['KeySchema']])
-                print(f"   - GSI: {gsi['IndexName']} -> {key_schema}")
+                summary.append(f"   - GSI: {gsi['IndexName']} -> {key_schema}")
         
-        print(f"\n🔧 Variables de entorno para la aplicación:")
-        print(f"   DYNAMODB_TABLE_NAME={table_name}")
-        print(f"   AWS_REGION={boto3.Session().region_name}")
+        summary.append(f"\n🔧 Variables de entorno para la aplicación:")
+        summary.append(f"   DYNAMODB_TABLE_NAME={table_name}")
+        summary.append(f"   AWS_REGION={_REGION}")
+        print("\n".join(summary))
         
         return table_name
         
@@ -289,7 +312,7 @@ def main():
     
     # Verificar credenciales de AWS
     try:
-        sts = boto3.client('sts')
+        sts = _SESSION.client('sts')
         identity = sts.get_caller_identity()
         print(f"🔐 Usando credenciales AWS para: {identity.get('Arn', 'N/A')}")
     except Exception as e:
@@ -297,26 +320,38 @@ def main():
         print(f"   Ejecuta: aws configure")
         sys.exit(1)
     
+    # Las tablas son independientes: se crean en paralelo para que las esperas
+    # se solapen. El cliente se crea aquí porque las sesiones de boto3 no son
+    # seguras entre hilos (los clientes sí)
+    dynamodb = _SESSION.client('dynamodb')
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        if args.table in ['logs', 'all']:
+            logs_future = executor.submit(create_task_scheduler_logs_table, args.environment, dynamodb)
+        if args.table in ['permissions', 'all']:
+            permissions_future = executor.submit(create_cost_center_permissions_table, args.environment, dynamodb)
+    
     created_tables = []
     
     if args.table in ['logs', 'all']:
-        logs_table = create_task_scheduler_logs_table(args.environment)
+        logs_table = logs_future.result()
         created_tables.append(logs_table)
     
     if args.table in ['permissions', 'all']:
-        permissions_table = create_cost_center_permissions_table(args.environment)
+        permissions_table = permissions_future.result()
         created_tables.append(permissions_table)
     
-    print(f"\n✨ Proceso completado. Tablas creadas:")
+    summary = []
+    summary.append(f"\n✨ Proceso completado. Tablas creadas:")
     for table in created_tables:
-        print(f"   - {table}")
+        summary.append(f"   - {table}")
     
-    print(f"\n🔧 Variables de entorno para la aplicación:")
+    summary.append(f"\n🔧 Variables de entorno para la aplicación:")
     if args.table in ['logs', 'all']:
-        print(f"   DYNAMODB_TABLE_NAME={logs_table}")
+        summary.append(f"   DYNAMODB_TABLE_NAME={logs_table}")
     if args.table in ['permissions', 'all']:
-        print(f"   PERMISSIONS_TABLE_NAME={permissions_table}")
-    print(f"   AWS_REGION={boto3.Session().region_name}")
+        summary.append(f"   PERMISSIONS_TABLE_NAME={permissions_table}")
+    summary.append(f"   AWS_REGION={_REGION}")
+    print("\n".join(summary))
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
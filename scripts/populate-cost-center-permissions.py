@@ -8,13 +8,53 @@ import boto3
 import argparse
 import sys
 import json
+import time
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-def populate_cost_center_permissions(environment='production'):
+# Reintentos adaptativos ante throttling de DynamoDB y conexiones keep-alive
+BOTO_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 10}, tcp_keepalive=True)
+
+# Máximo de claves por petición BatchGetItem
+BATCH_GET_MAX_KEYS = 100
+
+# Backoff exponencial para reintentar UnprocessedKeys: no llegan como error,
+# así que los reintentos adaptativos de botocore no las cubren
+UNPROCESSED_RETRY_BASE_DELAY = 0.05
+UNPROCESSED_RETRY_MAX_DELAY = 1.0
+
+def get_existing_cost_centers(dynamodb, table_name, cost_centers):
+    """
+    Devuelve el conjunto de centros de costo que ya existen en la tabla
+    """
+    existing = set()
+    for start in range(0, len(cost_centers), BATCH_GET_MAX_KEYS):
+        request_items = {
+            table_name: {
+                'Keys': [{'cost_center': cc} for cc in cost_centers[start:start + BATCH_GET_MAX_KEYS]],
+                'ProjectionExpression': 'cost_center'
+            }
+        }
+        # Reintentar las claves no procesadas hasta completar el lote
+        attempt = 0
+        while True:
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            existing.update(item['cost_center'] for item in response['Responses'].get(table_name, []))
+            request_items = response.get('UnprocessedKeys')
+            if not request_items:
+                break
+            time.sleep(min(UNPROCESSED_RETRY_BASE_DELAY * 2 ** attempt, UNPROCESSED_RETRY_MAX_DELAY))
+            attempt += 1
+    return existing
+
+def populate_cost_center_permissions(environment='production', session=None):
     """
     Poblar la tabla cost-center-permissions con centros de costo iniciales
     """
-    dynamodb = boto3.resource('dynamodb')
+    if session is None:
+        session = boto3.session.Session()
+    dynamodb = session.resource('dynamodb', config=BOTO_CONFIG)
+    client_exceptions = dynamodb.meta.client.exceptions
     table_name = f'cost-center-permissions-{environment}'
     
     try:
@@ -76,40 +116,55 @@ def populate_cost_center_permissions(environment='production'):
             }
         ]
         
-        # Insertar cada centro de costo
-        for cost_center_data in initial_cost_centers:
-            # Agregar timestamps
-            import time
-            cost_center_data['created_at'] = int(time.time())
-            cost_center_data['updated_at'] = int(time.time())
-            
-            try:
-                # Usar put_item con condition para no sobrescribir si ya existe
-                table.put_item(
-                    Item=cost_center_data,
-                    ConditionExpression='attribute_not_exists(cost_center)'
-                )
-                status = "✅ Creado"
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+        # batch_writer no admite ConditionExpression: se consultan primero en una
+        # sola petición BatchGetItem los centros de costo que ya existen, para
+        # no sobrescribirlos
+        existing_cost_centers = get_existing_cost_centers(
+            dynamodb, table_name, [cc['cost_center'] for cc in initial_cost_centers]
+        )
+        
+        # Insertar los centros de costo nuevos con BatchWriteItem (hasta 25 por petición)
+        now = int(time.time())
+        statuses = []
+        with table.batch_writer() as batch:
+            for cost_center_data in initial_cost_centers:
+                if cost_center_data['cost_center'] in existing_cost_centers:
                     status = "⚠️  Ya existe"
                 else:
-                    raise e
-            
-            print(f"   {status}: {cost_center_data['cost_center']} - {cost_center_data['description']}")
+                    # Agregar timestamps sin modificar los datos iniciales
+                    item = {**cost_center_data, 'created_at': now, 'updated_at': now}
+                    batch.put_item(Item=item)
+                    status = "✅ Creado"
+                
+                statuses.append(f"   {status}: {cost_center_data['cost_center']} - {cost_center_data['description']}")
+        print("\n".join(statuses))
         
         print(f"\n📊 Resumen de centros de costo:")
         
-        # Mostrar todos los centros de costo en la tabla
-        response = table.scan()
-        items = response['Items']
+        # Mostrar todos los centros de costo en la tabla: scan paginado con
+        # LastEvaluatedKey, contando autorizados en la misma pasada
+        items = []
+        authorized_count = 0
+        scan_kwargs = {
+            'ProjectionExpression': 'cost_center, is_authorized, max_concurrent_namespaces, authorized_namespaces'
+        }
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response['Items']:
+                items.append(item)
+                if item.get('is_authorized', False):
+                    authorized_count += 1
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
         
         print(f"   Total de centros de costo: {len(items)}")
-        print(f"   Autorizados: {len([item for item in items if item.get('is_authorized', False)])}")
-        print(f"   No autorizados: {len([item for item in items if not item.get('is_authorized', False)])}")
+        print(f"   Autorizados: {authorized_count}")
+        print(f"   No autorizados: {len(items) - authorized_count}")
         
         print(f"\n🔍 Detalle de centros de costo:")
-        for item in sorted(items, key=lambda x: x['cost_center']):
+        items.sort(key=lambda x: x['cost_center'])
+        for item in items:
             auth_status = "✅ Autorizado" if item.get('is_authorized', False) else "❌ No autorizado"
             max_ns = item.get('max_concurrent_namespaces', 0)
             namespaces = ', '.join(item.get('authorized_namespaces', []))
@@ -117,14 +172,13 @@ def populate_cost_center_permissions(environment='production'):
         
         return len(items)
         
+    except client_exceptions.ResourceNotFoundException:
+        print(f"❌ Error: La tabla {table_name} no existe")
+        print(f"   Ejecuta primero: python create_dynamodb_table.py --table permissions")
+        sys.exit(1)
     except ClientError as e:
-        if e.response['Error']['Code'] == 'ResourceNotFoundException':
-            print(f"❌ Error: La tabla {table_name} no existe")
-            print(f"   Ejecuta primero: python create_dynamodb_table.py --table permissions")
-            sys.exit(1)
-        else:
-            print(f"❌ Error accediendo a la tabla: {e}")
-            sys.exit(1)
+        print(f"❌ Error accediendo a la tabla: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"❌ Error inesperado: {e}")
         sys.exit(1)
@@ -138,9 +192,13 @@ def main():
     
     args = parser.parse_args()
     
+    # Una sola sesión para STS y DynamoDB: las credenciales y la región se
+    # resuelven una vez
+    session = boto3.session.Session()
+    
     # Verificar credenciales de AWS
     try:
-        sts = boto3.client('sts')
+        sts = session.client('sts', config=BOTO_CONFIG)
         identity = sts.get_caller_identity()
         print(f"🔐 Usando credenciales AWS para: {identity.get('Arn', 'N/A')}")
     except Exception as e:
@@ -154,7 +212,7 @@ def main():
         print("   (Funcionalidad dry-run no implementada)")
         return
     
-    count = populate_cost_center_permissions(args.environment)
+    count = populate_cost_center_permissions(args.environment, session)
     print(f"\n✨ Proceso completado. {count} centros de costo configurados.")
     print(f"\n💡 Consejos:")
     print(f"   - Usa el endpoint POST /api/cost-centers/<id>/permissions para modificar permisos")